@@ -0,0 +1,176 @@
+"""
+Frozen copy of the substring-based name matching that api.name_matcher replaced in
+polymarket.find_moneyline_market and map_outcomes_to_players (log calls removed).
+Kept only as the reference for the accuracy and speed comparison in
+name_matcher_benchmark.py; do not import it from the application.
+"""
+import json
+
+
+def normalize_name(name):
+    """Normalize name by removing special characters and extracting last name."""
+    name = str(name).lower()
+    # Remove special characters (í -> i, š -> s, etc.)
+    replacements = {
+        'í': 'i', 'š': 's', 'č': 'c', 'ř': 'r', 'ž': 'z',
+        'á': 'a', 'é': 'e', 'ó': 'o', 'ú': 'u', 'ý': 'y',
+        'ñ': 'n', 'ü': 'u', 'ö': 'o', 'ä': 'a'
+    }
+    for old, new in replacements.items():
+        name = name.replace(old, new)
+    # Get last name (last word)
+    parts = name.split()
+    return parts[-1] if parts else name
+
+
+def find_moneyline_market(data, player1, player2):
+    """
+    Find the moneyline (match winner) market for a match in a public-search response.
+    Returns the market dict, or None if not found.
+    """
+    # Check if we have events
+    events = data.get("events", [])
+    if not events:
+        return None
+    
+    # Find the event that contains both player names in the title
+    # Use normalized names to handle special characters
+    p1_lastname = normalize_name(player1)
+    p2_lastname = normalize_name(player2)
+    matching_event = None
+    for event in events:
+        title = event.get("title", "").lower()
+        title_normalized = normalize_name(title)
+        p1_lower = player1.lower()
+        p2_lower = player2.lower()
+        
+        # Check if both player names appear in the title (using multiple strategies)
+        p1_in_title = (p1_lower in title or p1_lastname in title or 
+                      p1_lastname in title_normalized)
+        p2_in_title = (p2_lower in title or p2_lastname in title or 
+                      p2_lastname in title_normalized)
+        
+        if p1_in_title and p2_in_title:
+            matching_event = event
+            break
+    
+    if not matching_event:
+        return None
+    
+    # Get markets for this event
+    markets = matching_event.get("markets", [])
+    if not markets:
+        return None
+    
+    # Find the moneyline market (head-to-head) with player names as outcomes
+    # Prioritize match winner markets over set-specific markets
+    moneyline_market = None
+    match_winner_market = None
+    other_player_market = None
+    
+    for market in markets:
+        outcomes = market.get("outcomes")
+        
+        # Parse outcomes if it's a string
+        if isinstance(outcomes, str):
+            try:
+                outcomes = json.loads(outcomes)
+            except:
+                continue
+        
+        if not outcomes or len(outcomes) < 2:
+            continue
+        
+        # Check if both player names appear in outcomes (case-insensitive)
+        # Use normalized names to handle special characters and last names
+        outcomes_lower = [str(o).lower() for o in outcomes]
+        outcomes_normalized = [normalize_name(o) for o in outcomes]
+        p1_lower = player1.lower()
+        p2_lower = player2.lower()
+        p1_lastname = normalize_name(player1)
+        p2_lastname = normalize_name(player2)
+        
+        # Check if both players are in the outcomes using multiple matching strategies
+        p1_found = False
+        p2_found = False
+        
+        for o_lower, o_norm in zip(outcomes_lower, outcomes_normalized):
+            # Check full name match
+            if p1_lower in o_lower or o_lower in p1_lower:
+                p1_found = True
+            # Check last name match
+            elif p1_lastname in o_lower or o_lower in p1_lower or p1_lastname == o_norm or o_norm in p1_lastname:
+                p1_found = True
+            
+            if p2_lower in o_lower or o_lower in p2_lower:
+                p2_found = True
+            elif p2_lastname in o_lower or o_lower in p2_lower or p2_lastname == o_norm or o_norm in p2_lastname:
+                p2_found = True
+        
+        if p1_found and p2_found:
+            question = market.get("question", "").lower()
+            
+            # Prioritize match winner markets (not set-specific)
+            if "match winner" in question or ("winner" in question and "set" not in question):
+                match_winner_market = market
+            # Avoid set-specific markets
+            elif "set" not in question:
+                other_player_market = market
+    
+    # Use match winner if found, otherwise use other non-set market
+    if match_winner_market:
+        moneyline_market = match_winner_market
+    elif other_player_market:
+        moneyline_market = other_player_market
+    
+    if not moneyline_market:
+        return None
+    
+    return moneyline_market
+
+
+def map_outcomes_to_players(market, player1, player2):
+    """
+    Work out which outcome of a market belongs to which player.
+    Returns (p1_index, p2_index); falls back to (0, 1) if names cannot be matched.
+    """
+    outcomes = market.get("outcomes")
+    if isinstance(outcomes, str):
+        try:
+            outcomes = json.loads(outcomes)
+        except:
+            outcomes = [str(outcomes)]
+    
+    # Normalize player names to get last names
+    p1_lastname = normalize_name(player1)
+    p2_lastname = normalize_name(player2)
+    
+    # Map outcomes to players by matching names
+    p1_index = None
+    p2_index = None
+    
+    for i, outcome in enumerate(outcomes):
+        outcome_lower = str(outcome).lower()
+        outcome_normalized = normalize_name(outcome)
+        
+        # Match outcome to player using multiple strategies
+        # 1. Check if full player name is in outcome or vice versa
+        # 2. Check if last names match
+        # 3. Check if normalized last names match
+        p1_match = (p1_lastname in outcome_lower or outcome_lower in player1.lower() or 
+                   p1_lastname == outcome_normalized or outcome_normalized in p1_lastname or
+                   p1_lastname in outcome_normalized)
+        p2_match = (p2_lastname in outcome_lower or outcome_lower in player2.lower() or 
+                   p2_lastname == outcome_normalized or outcome_normalized in p2_lastname or
+                   p2_lastname in outcome_normalized)
+        
+        if p1_match:
+            p1_index = i
+        elif p2_match:
+            p2_index = i
+    
+    # If we couldn't match by name, assume order matches (first outcome = first player)
+    if p1_index is None or p2_index is None:
+        return 0, 1
+    
+    return p1_index, p2_index
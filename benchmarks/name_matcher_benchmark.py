@@ -0,0 +1,139 @@
+"""
+Accuracy check and micro-benchmark for the Polymarket name matching (api.name_matcher).
+
+fixtures/names/pairs.json pairs SofaScore player names with the event title and
+outcome spellings Polymarket uses for the same match ("expected" is
+[p1_index, p2_index] into outcomes). Each case becomes a public-search response
+with a set market and a match winner market, mixed with the events of other
+cases. Some searches drop the match's own event, where the right answer is no
+market.
+
+1. Accuracy: share of searches where find_moneyline_market and
+   map_outcomes_to_players pick the right market and outcome order (or no
+   market), for the new matcher and the previous substring matching in
+   legacy_name_matching.py.
+2. Micro-benchmark: time per search response for both.
+
+Exits with status 1 if the new matcher gets any fixture pair wrong.
+
+Usage:
+    python benchmarks/name_matcher_benchmark.py
+    python benchmarks/name_matcher_benchmark.py --searches 2000 --distractors 20
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import legacy_name_matching
+from src.api import name_matcher, polymarket
+
+PAIRS_FILE = os.path.join(REPO_ROOT, "benchmarks", "fixtures", "names", "pairs.json")
+
+
+def build_event(case_id, case):
+    """Polymarket event for a fixture case: a set market listed before the match winner market."""
+    outcomes = json.dumps(case["outcomes"])
+    return {
+        "title": case["title"],
+        "markets": [
+            {"id": f"{case_id}-set1", "question": f"{case['title']}: Set 1 Winner", "outcomes": outcomes},
+            {"id": f"{case_id}-winner", "question": f"{case['title']}: Match Winner", "outcomes": outcomes},
+        ]
+    }
+
+
+def build_searches(cases, count, distractors, negative_share, rng):
+    """Return [(player1, player2, search response, expected (market id, p1_index, p2_index) or None)]."""
+    events = [build_event(i, case) for i, case in enumerate(cases)]
+    searches = []
+    for _ in range(count):
+        case_id = rng.randrange(len(cases))
+        case = cases[case_id]
+        others = [i for i in rng.sample(range(len(cases)), min(distractors + 1, len(cases))) if i != case_id][:distractors]
+        included = [] if rng.random() < negative_share else [case_id]
+        response_events = [events[i] for i in others + included]
+        rng.shuffle(response_events)
+        
+        expected = None
+        if included:
+            expected = (f"{case_id}-winner", *case["expected"])
+        searches.append((case["player1"], case["player2"], {"events": response_events}, expected))
+    return searches
+
+
+def resolve(module, player1, player2, data):
+    market = module.find_moneyline_market(data, player1, player2)
+    if market is None:
+        return None
+    return (market["id"], *module.map_outcomes_to_players(market, player1, player2))
+
+
+def accuracy(module, searches):
+    return sum(resolve(module, p1, p2, data) == expected for p1, p2, data, expected in searches) / len(searches)
+
+
+def check_pairs(cases):
+    """Every fixture pair alone in a response must resolve exactly; returns the number of failures."""
+    failures = 0
+    for i, case in enumerate(cases):
+        result = resolve(polymarket, case["player1"], case["player2"], {"events": [build_event(i, case)]})
+        expected = (f"{i}-winner", *case["expected"])
+        if result != expected:
+            print(f"  ✗ {case['player1']} vs {case['player2']}: got {result}, expected {expected}")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark Polymarket name matching")
+    parser.add_argument("--searches", type=int, default=1000, help="Random search responses to resolve")
+    parser.add_argument("--distractors", type=int, default=8, help="Other events per search response")
+    parser.add_argument("--negative-share", type=float, default=0.2, help="Share of searches without the match's event")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over all searches")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    
+    # The legacy fallback warnings would drown the report
+    logging.disable(logging.WARNING)
+    
+    with open(PAIRS_FILE, encoding='utf-8') as f:
+        cases = json.load(f)
+    
+    failures = check_pairs(cases)
+    if failures:
+        print(f"✗ Fixture pairs: {failures} of {len(cases)} resolved wrongly")
+        return 1
+    print(f"✓ Fixture pairs: all {len(cases)} resolved to the right market and outcome order")
+    
+    searches = build_searches(cases, args.searches, args.distractors, args.negative_share, random.Random(args.seed))
+    print(f"  Accuracy over {len(searches)} searches: name_matcher {accuracy(polymarket, searches):.1%}, "
+          f"legacy {accuracy(legacy_name_matching, searches):.1%}")
+    
+    def run(module):
+        for p1, p2, data, _ in searches:
+            resolve(module, p1, p2, data)
+    
+    def run_cold():
+        for cached in (name_matcher.name_key, name_matcher.name_tokens, name_matcher.split_name,
+                       name_matcher.token_trigrams, name_matcher.candidate_trigrams,
+                       name_matcher.name_score, name_matcher._match_players):
+            cached.cache_clear()
+        run(polymarket)
+    
+    cold = timeit.timeit(run_cold, number=1) / len(searches)
+    warm = min(timeit.repeat(lambda: run(polymarket), number=1, repeat=args.repeat)) / len(searches)
+    legacy = min(timeit.repeat(lambda: run(legacy_name_matching), number=1, repeat=args.repeat)) / len(searches)
+    print(f"  Per search: name_matcher {warm * 1e6:.0f} µs ({cold * 1e6:.0f} µs with cold caches), "
+          f"legacy {legacy * 1e6:.0f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""
+End-to-end benchmark of one poll of the main loop.
+
+Builds synthetic live events for several slate sizes, serves SofaScore and
+Polymarket responses from an in-process fake API with configurable latency, and
+drives process_matches exactly as main.py does. For every poll it reports wall
+time, CPU time and requests per match; peak memory is measured separately over
+a cold first poll with tracemalloc. Results are written as JSON so runs on
+different commits can be compared (--compare).
+
+Usage:
+    python benchmarks/poll_benchmark.py
+    python benchmarks/poll_benchmark.py --sizes 10 100 --latency 0.02 --concurrent
+    python benchmarks/poll_benchmark.py --compare benchmarks/results/poll_abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import config
+from src.api.sofascore import fetch_live_events
+from src.processors.match_processor import process_matches
+from src.storage.cache_manager import CacheManager
+from src.storage.csv_logger import close_match_log, ensure_csv_header
+from src.storage.snapshot_store import close_snapshots
+
+DEFAULT_SIZES = [10, 100, 500, 2000]
+
+# (sets home, sets away, games per set, status description)
+SCORE_STATES = [
+    (0, 0, [(2, 1)], "1st set"),
+    (1, 0, [(6, 3), (2, 2)], "2nd set"),
+    (0, 1, [(3, 6), (3, 1)], "2nd set"),
+    (1, 1, [(6, 3), (4, 6), (1, 0)], "3rd set"),
+    (1, 1, [(6, 3), (4, 6), (5, 5)], "3rd set"),
+    (1, 1, [(6, 4), (3, 6), (6, 6)], "3rd set"),
+    (1, 0, [(7, 6), (5, 4)], "2nd set"),
+]
+
+POINTS = ["0", "15", "30", "40", "A"]
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+        self.text = json.dumps(data)
+        self.headers = {}
+    
+    def json(self):
+        return self._data
+
+
+def player_names(i):
+    # Fixed-width numbers so no name is a substring of another
+    return f"Hugo H{i:05d}", f"Alan A{i:05d}"
+
+
+def build_event(i, rng):
+    sets_home, sets_away, periods, status = SCORE_STATES[i % len(SCORE_STATES)]
+    player1, player2 = player_names(i)
+    home_score = {"current": sets_home, "point": rng.choice(POINTS)}
+    away_score = {"current": sets_away, "point": rng.choice(POINTS)}
+    for number, (home_games, away_games) in enumerate(periods, 1):
+        home_score[f"period{number}"] = home_games
+        away_score[f"period{number}"] = away_games
+    return {
+        "id": 100000 + i,
+        "homeTeam": {"id": 2 * i, "name": player1, "ranking": rng.randint(1, 300)},
+        "awayTeam": {"id": 2 * i + 1, "name": player2, "ranking": rng.randint(1, 300)},
+        "tournament": {
+            "name": "ATP Benchmark Open", "slug": "atp-benchmark",
+            "category": {"name": "ATP", "slug": "atp"},
+            "uniqueTournament": {"id": 1, "name": "ATP Benchmark Open"}
+        },
+        "homeScore": home_score,
+        "awayScore": away_score,
+        "status": {"code": 9, "description": status}
+    }
+
+
+def build_stats(match_id):
+    rng = random.Random(match_id)
+    
+    def item(name, key, home, away, **extra):
+        entry = {"name": name, "key": key, "home": str(home), "away": str(away), "homeValue": home, "awayValue": away}
+        entry.update(extra)
+        return entry
+    
+    bp_home, bp_away = rng.randint(0, 8), rng.randint(0, 8)
+    saved_home, saved_away = rng.randint(0, bp_home), rng.randint(0, bp_away)
+    return {"statistics": [{"period": "ALL", "groups": [
+        {"groupName": "Service", "statisticsItems": [
+            item("Aces", "aces", rng.randint(0, 15), rng.randint(0, 15)),
+            item("Double faults", "doubleFaults", rng.randint(0, 8), rng.randint(0, 8)),
+            item("First serve", "firstServeAccuracy", rng.randint(20, 40), rng.randint(20, 40), homeTotal=50, awayTotal=50),
+            item("Second serve", "secondServeAccuracy", rng.randint(5, 15), rng.randint(5, 15), homeTotal=20, awayTotal=20),
+            item("First serve points", "firstServePointsAccuracy", rng.randint(15, 30), rng.randint(15, 30), homeTotal=35, awayTotal=35),
+            item("Second serve points", "secondServePointsAccuracy", rng.randint(5, 12), rng.randint(5, 12), homeTotal=15, awayTotal=15),
+            {"name": "Break points saved", "key": "breakPointsSaved",
+             "home": f"{saved_home}/{bp_home} (0%)", "away": f"{saved_away}/{bp_away} (0%)",
+             "homeValue": saved_home, "awayValue": saved_away, "homeTotal": bp_home, "awayTotal": bp_away},
+        ]},
+        {"groupName": "Points", "statisticsItems": [
+            item("Total", "pointsTotal", rng.randint(40, 120), rng.randint(40, 120)),
+            item("Service points won", "servicePointsScored", rng.randint(20, 60), rng.randint(20, 60)),
+            item("Receiver points won", "receiverPointsScored", rng.randint(10, 40), rng.randint(10, 40)),
+        ]},
+        {"groupName": "Games", "statisticsItems": [
+            item("Total won", "gamesWon", rng.randint(5, 18), rng.randint(5, 18)),
+        ]},
+        {"groupName": "Return", "statisticsItems": [
+            item("Break points converted", "breakPointsScored", bp_away - saved_away, bp_home - saved_home),
+        ]},
+    ]}]}
+
+
+class FakeApi:
+    """
+    In-process stand-in for the SofaScore, Polymarket and Telegram APIs.
+    Every request sleeps for `latency` seconds and is counted by endpoint.
+    """
+    
+    def __init__(self, events, latency):
+        self.events = events
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.requests = {}
+    
+    def _count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+    
+    def total_requests(self):
+        with self._lock:
+            return sum(self.requests.values())
+    
+    def get(self, url, params=None, **kwargs):
+        if url == config.SOFASCORE_LIVE_EVENTS_URL:
+            self._count("live_events")
+            return FakeResponse(200, {"events": self.events})
+        match = re.search(r"/event/(\d+)/statistics$", url)
+        if match:
+            self._count("statistics")
+            return FakeResponse(200, build_stats(int(match.group(1))))
+        match = re.search(r"/event/(\d+)$", url)
+        if match:
+            self._count("event_details")
+            return FakeResponse(200, {"event": {
+                "id": int(match.group(1)), "firstToServe": 1, "homeTeam": {"id": 1}, "awayTeam": {"id": 2},
+                "tournament": {"id": 1, "uniqueTournament": {"id": 1}}
+            }})
+        if url == config.POLYMARKET_SEARCH_URL:
+            self._count("polymarket_search")
+            player1, player2 = params["q"].split(" Alan ")
+            player2 = "Alan " + player2
+            market_id = player1.rsplit(" H", 1)[1]
+            return FakeResponse(200, {"events": [{"title": f"{player1} vs {player2}", "markets": [{
+                "id": market_id, "question": f"{player1} vs {player2}: Match Winner",
+                "outcomes": json.dumps([player1, player2]), "outcomePrices": json.dumps(["0.55", "0.45"])
+            }]}]})
+        if "/markets/" in url:
+            self._count("polymarket_market")
+            return FakeResponse(200, {"id": url.rsplit("/", 1)[1], "outcomes": json.dumps(["a", "b"]),
+                                      "outcomePrices": json.dumps(["0.57", "0.43"])})
+        self._count("other")
+        return FakeResponse(404, {})
+    
+    def post(self, url, **kwargs):
+        self._count("telegram")
+        return FakeResponse(200, {"ok": True})
+
+
+def advance_scores(events, rng, fraction):
+    """Move the point score of a fraction of matches, as happens between real polls."""
+    for event in rng.sample(events, max(1, int(len(events) * fraction))):
+        event["homeScore"]["point"] = rng.choice(POINTS)
+        event["awayScore"]["point"] = rng.choice(POINTS)
+
+
+def run_polls(size, polls, latency, change_fraction, seed, measure_memory=False):
+    """
+    Run `polls` polls over a fresh slate of `size` matches with cold caches.
+    Returns a list of per-poll result dicts.
+    """
+    rng = random.Random(seed)
+    events = [build_event(i, rng) for i in range(size)]
+    api = FakeApi(events, latency)
+    cache_manager = CacheManager()
+    results = []
+    
+    for poll in range(polls):
+        if poll:
+            advance_scores(events, rng, change_fraction)
+        requests_before = api.total_requests()
+        if measure_memory:
+            tracemalloc.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            live_events = fetch_live_events(api)
+            checked, qualified, skipped = process_matches(live_events, api, cache_manager)
+            cache_manager.cleanup_old_matches({event["id"] for event in live_events})
+        
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        result = {
+            "poll": poll + 1,
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "requests": api.total_requests() - requests_before,
+            "requests_per_match": round((api.total_requests() - requests_before) / size, 3),
+            "checked": checked,
+            "qualified": qualified,
+            "skipped": skipped
+        }
+        if measure_memory:
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append(result)
+    return results, dict(api.requests)
+
+
+def benchmark_size(size, polls, latency, change_fraction, seed):
+    polls_result, requests_by_endpoint = run_polls(size, polls, latency, change_fraction, seed)
+    # Peak memory over a cold first poll, in a separate pass so tracing does not skew timings
+    memory_result, _ = run_polls(size, 1, 0, change_fraction, seed, measure_memory=True)
+    walls = [poll["wall_seconds"] for poll in polls_result]
+    return {
+        "matches": size,
+        "polls": polls_result,
+        "requests_by_endpoint": requests_by_endpoint,
+        "summary": {
+            "first_poll_wall_seconds": walls[0],
+            "warm_poll_wall_seconds": round(sum(walls[1:]) / len(walls[1:]), 4) if len(walls) > 1 else None,
+            "total_cpu_seconds": round(sum(poll["cpu_seconds"] for poll in polls_result), 4),
+            "requests_per_match": round(sum(poll["requests"] for poll in polls_result) / (size * polls), 3),
+            "peak_memory_bytes": memory_result[0]["peak_memory_bytes"]
+        }
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(report, baseline):
+    baseline_by_size = {entry["matches"]: entry["summary"] for entry in baseline["results"]}
+    print(f"\nCompared with {baseline.get('commit', '?')}:")
+    for entry in report["results"]:
+        previous = baseline_by_size.get(entry["matches"])
+        if not previous:
+            continue
+        changes = []
+        for key, current in entry["summary"].items():
+            before = previous.get(key)
+            if current is None or not before:
+                continue
+            changes.append(f"{key} {(current - before) / before * 100:+.1f}%")
+        print(f"  {entry['matches']:>5} matches: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process_matches end to end on synthetic slates.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Slate sizes (default: 10 100 500 2000)")
+    parser.add_argument("--polls", type=int, default=3, help="Polls per size; the first runs on cold caches (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.002, help="Fake API latency per request in seconds (default: 0.002)")
+    parser.add_argument("--change-fraction", type=float, default=0.2, help="Share of matches whose score moves between polls (default: 0.2)")
+    parser.add_argument("--concurrent", action="store_true", help="Process matches on the thread pool (CONCURRENT_PROCESSING)")
+    parser.add_argument("--workers", type=int, default=config.MAX_WORKERS, help=f"Thread pool size (default: {config.MAX_WORKERS})")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="JSON report path (default: benchmarks/results/poll_<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Print changes against an earlier JSON report")
+    args = parser.parse_args()
+    
+    # Keep outputs and alerts away from real data and Telegram
+    workdir = tempfile.mkdtemp(prefix="poll_benchmark_")
+    config.OUTPUT_CSV = os.path.join(workdir, "matches.csv")
+    config.OUTPUT_SQLITE = os.path.join(workdir, "matches.db")
+    config.SNAPSHOTS_DIR = os.path.join(workdir, "snapshots")
+    config.MARKET_RESOLUTIONS_FILE = os.path.join(workdir, "market_resolutions.json")
+    config.TELEGRAM_BOT_TOKEN = "benchmark"
+    config.TELEGRAM_CHAT_ID = "0"
+    config.CONCURRENT_PROCESSING = args.concurrent
+    config.MAX_WORKERS = args.workers
+    ensure_csv_header()
+    
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "polls": args.polls, "latency_seconds": args.latency, "change_fraction": args.change_fraction,
+            "concurrent": args.concurrent, "workers": args.workers, "seed": args.seed
+        },
+        "results": []
+    }
+    
+    try:
+        for size in args.sizes:
+            entry = benchmark_size(size, args.polls, args.latency, args.change_fraction, args.seed)
+            report["results"].append(entry)
+            summary = entry["summary"]
+            warm = summary["warm_poll_wall_seconds"]
+            warm_str = f"{warm:.3f}s" if warm is not None else "n/a"
+            print(f"{size:>5} matches: first poll {summary['first_poll_wall_seconds']:.3f}s, warm poll {warm_str}, "
+                  f"CPU {summary['total_cpu_seconds']:.3f}s, {summary['requests_per_match']} req/match, "
+                  f"peak {summary['peak_memory_bytes'] / 1e6:.1f} MB")
+    finally:
+        close_match_log()
+        close_snapshots()
+    
+    output = args.output or os.path.join("benchmarks", "results", f"poll_{commit}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, mode='w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results saved to {output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parity check and micro-benchmark for analysis.slate_ranking.rank_slate.
+
+1. Parity check: for random stat sets, the sign of the vectorised dominance score
+   must pick the same player as determine_better_player ('tie' for 0).
+2. Micro-benchmark: time to rank a whole slate with rank_slate against a
+   determine_better_player call per match.
+
+Exits with status 1 if the parity check fails.
+
+Usage:
+    python benchmarks/slate_ranking_benchmark.py
+    python benchmarks/slate_ranking_benchmark.py --matches 200 2000 --repeat 50
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.analysis.player_comparison import determine_better_player
+from src.analysis.slate_ranking import rank_slate
+from src.processors.match_stats import STAT_FIELDS, MatchStats
+
+
+def random_entries(count, rng):
+    """Return count random rank_slate entries with small, tie-prone stat values."""
+    entries = []
+    for match_id in range(count):
+        stats = MatchStats([rng.randint(0, 12) for _ in STAT_FIELDS])
+        p1_prob = rng.uniform(0.05, 0.95)
+        entries.append((match_id, f"P1 {match_id}", f"P2 {match_id}", stats, (p1_prob, 1 - p1_prob)))
+    return entries
+
+
+def check_parity(entries):
+    failures = 0
+    by_match = {entry[0]: entry[3] for entry in entries}
+    for ranked in rank_slate(entries):
+        stats = by_match[ranked['match_id']]
+        expected = determine_better_player(stats.p1, stats.p2)
+        dominance = ranked['dominance']
+        actual = 'p1' if dominance > 0 else 'p2' if dominance < 0 else 'tie'
+        if actual != expected:
+            print(f"  ✗ match {ranked['match_id']}: dominance {dominance:.3f} -> {actual}, "
+                  f"determine_better_player -> {expected}")
+            failures += 1
+    return failures
+
+
+def per_match_loop(entries):
+    return [determine_better_player(entry[3].p1, entry[3].p2) for entry in entries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the vectorised slate ranking")
+    parser.add_argument("--matches", type=int, nargs="+", default=[200, 2000], help="Slate sizes to time")
+    parser.add_argument("--parity", type=int, default=5000, help="Random matches for the parity check")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per slate size")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    
+    failures = check_parity(random_entries(args.parity, rng))
+    if failures:
+        print(f"✗ Parity check: {failures} of {args.parity} match(es) differ")
+        return 1
+    print(f"✓ Parity check: {args.parity} random matches agree with determine_better_player")
+    
+    for count in args.matches:
+        entries = random_entries(count, rng)
+        vectorised = min(timeit.repeat(lambda: rank_slate(entries), number=1, repeat=args.repeat))
+        # Fresh MatchStats each run so the per-match loop pays for its lazy PlayerStats views
+        loop = min(timeit.repeat(lambda: per_match_loop([(*e[:3], MatchStats(e[3].values)) for e in entries]),
+                                 number=1, repeat=args.repeat))
+        print(f"  {count} matches: rank_slate {vectorised * 1000:.2f} ms, "
+              f"determine_better_player loop {loop * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
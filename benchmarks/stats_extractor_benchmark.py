@@ -0,0 +1,123 @@
+"""
+Equivalence check and micro-benchmark for stats_extractor.extract_all_stats.
+The golden check against the saved payloads in tests/fixtures/stats is
+tests/test_stats_extractor.py.
+
+1. Equivalence check: randomly reshuffled, duplicated, renamed and truncated
+   variants of the saved payloads must give the same result (or raise the same
+   exception type) as the previous if/elif extractor in legacy_stats_extractor.py.
+   Variants keep their group names and only use break point strings that parse
+   completely or not at all: keyed items no longer depend on the group, and a
+   half-parseable 'saved/faced' string no longer stores the saved count alone.
+2. Micro-benchmark: time per payload for both extractors.
+
+Exits with status 1 if any check fails.
+
+Usage:
+    python benchmarks/stats_extractor_benchmark.py
+    python benchmarks/stats_extractor_benchmark.py --variants 5000 --repeat 20000
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.legacy_stats_extractor import extract_all_stats as legacy_extract_all_stats
+from src.api.sofascore import parse_match_stats
+from src.processors.stats_extractor import extract_all_stats
+
+FIXTURES_DIR = os.path.join(REPO_ROOT, "tests", "fixtures", "stats")
+EXPECTED_FILE = os.path.join(FIXTURES_DIR, "expected.json")
+
+
+def load_fixtures():
+    """Return {fixture name: full-match statistics block} for every saved payload."""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        if path == EXPECTED_FILE:
+            continue
+        with open(path, encoding='utf-8') as f:
+            fixtures[os.path.basename(path)[:-5]] = parse_match_stats(200, json.load(f))
+    return fixtures
+
+
+def make_variant(stats, rng):
+    """Perturb a payload the ways SofaScore responses differ between matches and polls."""
+    stats = copy.deepcopy(stats)
+    groups = stats["groups"]
+    rng.shuffle(groups)
+    for group in groups:
+        items = group["statisticsItems"]
+        if items and rng.random() < 0.3:
+            items.append(copy.deepcopy(rng.choice(items)))
+        if items and rng.random() < 0.2:
+            items.pop(rng.randrange(len(items)))
+        rng.shuffle(items)
+        for item in items:
+            if rng.random() < 0.1 and item.get("name"):
+                item["title"] = item.pop("name").upper()
+            if rng.random() < 0.05:
+                item.pop(rng.choice(["homeValue", "awayTotal", "home", "away"]), None)
+            if rng.random() < 0.05:
+                item["home"] = rng.choice(["-", "3/4", "10/12 (83%)", "x/y (0%)", "", "7"])
+    return stats
+
+
+def run_extractor(extract, stats):
+    try:
+        return extract(stats)
+    except Exception as e:
+        return type(e).__name__
+
+
+def check_variants(fixtures, count, seed):
+    rng = random.Random(seed)
+    payloads = list(fixtures.values())
+    failures = 0
+    for i in range(count):
+        stats = make_variant(rng.choice(payloads), rng)
+        expected = run_extractor(legacy_extract_all_stats, stats)
+        result = run_extractor(lambda payload: extract_all_stats(payload).as_dict(), stats)
+        if result != expected:
+            failures += 1
+            if failures <= 5:
+                print(f"  ✗ variant {i}: {json.dumps(stats)[:300]}...")
+    return failures
+
+
+def time_extractor(extract, payloads, repeat):
+    """Best-of-5 seconds per payload."""
+    timer = timeit.Timer(lambda: [extract(stats) for stats in payloads])
+    return min(timer.repeat(repeat=5, number=repeat)) / (repeat * len(payloads))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the statistics extractor.")
+    parser.add_argument("--variants", type=int, default=2000, help="Randomised payloads compared with the legacy extractor (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5000, help="Timed extractions per payload (default: 5000)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    fixtures = load_fixtures()
+    variant_failures = check_variants(fixtures, args.variants, args.seed)
+    print(f"{'✓' if not variant_failures else '✗'} Randomised payloads: {args.variants - variant_failures}/{args.variants} match the legacy extractor")
+    
+    payloads = list(fixtures.values())
+    legacy_seconds = time_extractor(legacy_extract_all_stats, payloads, args.repeat)
+    new_seconds = time_extractor(extract_all_stats, payloads, args.repeat)
+    print(f"Legacy extractor: {legacy_seconds * 1e6:.1f} µs/payload")
+    print(f"Table extractor:  {new_seconds * 1e6:.1f} µs/payload ({legacy_seconds / new_seconds:.1f}x faster)")
+    
+    if variant_failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
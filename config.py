@@ -7,19 +7,138 @@ load_dotenv()
 # API URLs
 SOFASCORE_LIVE_EVENTS_URL = "https://api.sofascore.com/api/v1/sport/tennis/events/live"
 SOFASCORE_STATS_URL_TEMPLATE = "https://api.sofascore.com/api/v1/event/{match_id}/statistics"
+SOFASCORE_EVENT_URL_TEMPLATE = "https://api.sofascore.com/api/v1/event/{match_id}"
 POLYMARKET_SEARCH_URL = "https://gamma-api.polymarket.com/public-search"
+POLYMARKET_MARKET_URL_TEMPLATE = "https://gamma-api.polymarket.com/markets/{market_id}"
+
+# HTTP client
+SOFASCORE_CONNECT_TIMEOUT_SECONDS = 5
+SOFASCORE_READ_TIMEOUT_SECONDS = 10
+HTTP_POOL_SIZE = 32
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF_SECONDS = 0.5
+HTTP_RETRY_BACKOFF_MAX_SECONDS = 5
+
+# Rate limits per host as (requests per second, burst size). Requests over budget wait in line.
+RATE_LIMITS = {
+    "api.sofascore.com": (8, 16),
+    "gamma-api.polymarket.com": (5, 10),
+    "api.telegram.org": (1, 3),
+}
+DEFAULT_RATE_LIMIT = (5, 10)
+# Used when a 429 response has no Retry-After header
+RATE_LIMIT_DEFAULT_PAUSE_SECONDS = 5
+# How many times a rate limited request is re-queued before the 429 is returned
+RATE_LIMIT_MAX_RETRIES = 3
 
 # File paths
 OUTPUT_CSV = "data/tennis_dawgs.csv"
+OUTPUT_SQLITE = "data/tennis_dawgs.db"
+MARKET_RESOLUTIONS_FILE = "data/market_resolutions.json"
+
+# Snapshots (score, stats, odds) of the matches processed each poll, one file per day;
+# matches skipped as unchanged are not snapshotted
+SNAPSHOTS_ENABLED = True
+SNAPSHOTS_DIR = "data/snapshots"
+
+# Where logged matches are stored: "csv", "sqlite" or "both"
+STORAGE_BACKEND = "csv"
+
+# CSV output buffering: rows are written after CSV_FLUSH_ROWS rows, CSV_FLUSH_SECONDS,
+# or at the end of every poll. CSV_FSYNC_POLICY is "never", "on_flush" or "on_close".
+CSV_FLUSH_ROWS = 50
+CSV_FLUSH_SECONDS = 30
+CSV_FSYNC_POLICY = "on_flush"
+
+# SQLite inserts are batched into one transaction per SQLITE_BATCH_ROWS rows,
+# SQLITE_FLUSH_SECONDS, or poll
+SQLITE_BATCH_ROWS = 50
+SQLITE_FLUSH_SECONDS = 30
 
 # Telegram config
 # Set these via environment variables: TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+# Telegram delivery: alerts are queued and sent by a background thread
+TELEGRAM_DISPATCH_QUEUE = True
+TELEGRAM_QUEUE_MAXSIZE = 100
+TELEGRAM_MAX_RETRIES = 3
+TELEGRAM_RETRY_BACKOFF_SECONDS = 2
+TELEGRAM_RETRY_BACKOFF_MAX_SECONDS = 30
+TELEGRAM_SPILL_FILE = "data/telegram_spill.jsonl"
+# Spilled alerts older than this are dropped instead of re-queued on the next start
+TELEGRAM_SPILL_MAX_AGE_SECONDS = 15 * 60
+# How long to keep delivering queued alerts on shutdown before spilling the rest
+TELEGRAM_SHUTDOWN_TIMEOUT_SECONDS = 10
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Alert digest: combine the alerts of one poll into as few messages as possible.
+# Alert types listed as urgent ("one_one", "break", "tiebreak") skip the digest.
+ALERT_DIGEST_MODE = False
+DIGEST_URGENT_ALERT_TYPES = ["tiebreak"]
+
 # Tournament filters
 ALLOWED_TOURNAMENTS = ["ATP", "WTA", "Challenger", "UTR", "Unknown"]
 
 # Polling
 POLL_INTERVAL_SECONDS = 15
+# Events whose score has not changed are skipped, but still fully processed at least this often
+EVENT_REFRESH_SECONDS = 120
+
+# Adaptive polling tiers (see src/processors/poll_scheduler.py)
+# Live events are polled every HOT_POLL_INTERVAL_SECONDS while any match is hot.
+# A changed match is re-processed (stats/odds) at most once per its tier's refresh interval.
+HOT_POLL_INTERVAL_SECONDS = 5
+TIER_REFRESH_SECONDS = {"hot": 0, "warm": 30, "cold": 90}
+
+# Polymarket odds cache
+# Quotes younger than the TTL are reused; alert paths may also use a quote up to
+# ODDS_CACHE_STALE_SECONDS past its TTL while it is refreshed in the background.
+# Failed lookups are only remembered for ODDS_CACHE_FAILURE_TTL_SECONDS (0 = not at all)
+ODDS_CACHE_TTL_SECONDS = 30
+ODDS_CACHE_STALE_SECONDS = 120
+ODDS_CACHE_FAILURE_TTL_SECONDS = 5
+ODDS_CACHE_MAX_ENTRIES = 500
+
+# Polymarket market resolution
+# Matches with no market are not searched again until the negative entry expires
+MARKET_NEGATIVE_CACHE_SECONDS = 600
+MARKET_RESOLUTION_MAX_AGE_SECONDS = 2 * 24 * 60 * 60
+# Minimum name match score (0-1) for a Polymarket title or outcome to count as a player;
+# a matching surname alone scores 0.75, a surname with one misspelt letter about 0.6
+NAME_MATCH_MIN_SCORE = 0.6
+
+# Starting odds capture: retry with exponential backoff until a first quote is found
+STARTING_ODDS_RETRY_BASE_SECONDS = 30
+STARTING_ODDS_RETRY_MAX_SECONDS = 600
+
+# Match processing
+# When enabled, live events are processed by a bounded thread pool instead of one after another
+CONCURRENT_PROCESSING = False
+MAX_WORKERS = 8
+
+# Slate ranking: each poll, rank every live match by how far a weighted stats-dominance
+# score diverges from the Polymarket probability, using each match's last known stats
+# and odds. Stats and odds of up to SLATE_RANKING_REFRESH_BUDGET matches not loaded by
+# the poll itself are refreshed per poll, least recently refreshed first. Off by default:
+# the refreshes add up to 2 * SLATE_RANKING_REFRESH_BUDGET requests to every poll.
+SLATE_RANKING_ENABLED = False
+SLATE_RANKING_REFRESH_BUDGET = 20
+SLATE_RANKING_TOP_N = 5
+SLATE_RANKING_MIN_DIVERGENCE = 0.15
+
+# Logging: LOG_LEVEL "INFO" logs per-poll summaries and alert events, "DEBUG" every match.
+# LOG_FORMAT is "console" (coloured, as printed before), "compact" or "json".
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "console")
+
+# Metrics: serve Prometheus text-format metrics at http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
 
+# Async mode: overlap all requests of a poll on one thread with aiohttp
+ASYNC_MODE = False
+ASYNC_MAX_CONNECTIONS = 100
+ASYNC_REQUEST_TIMEOUT_SECONDS = 10
@@ -1,64 +1,201 @@
+import argparse
+import asyncio
 import cloudscraper
+import glob
+import os
+import signal
+import sys
 import time
-import datetime
 import config
-from src.api.sofascore import fetch_live_events
-from src.processors.match_processor import process_match
+from src.alerts.dispatcher import start_dispatcher, stop_dispatcher
+from src.api.replay import RecordingScraper, ReplayScraper
+from src.api.sofascore import fetch_live_events, SofaScoreClient
+from src.processors.async_poller import run_async_poll_loop
+from src.processors.match_processor import process_matches, log_poll_summary
+from src.processors.poll_scheduler import plan_next_poll
 from src.storage.cache_manager import CacheManager
-from src.storage.csv_logger import ensure_csv_header
+from src.storage.csv_logger import ensure_csv_header, close_match_log
+from src.storage.snapshot_store import close_snapshots
 from src.utils.constants import RESET
+from src.utils.helpers import current_timestamp
+from src.utils.logger import get_logger, setup_logging
+from src.utils.metrics import start_metrics_server
 
-# Create a CloudScraper session
-scraper = cloudscraper.create_scraper()
+logger = get_logger("main")
 
-# Initialize cache manager
-cache_manager = CacheManager()
 
-# Ensure CSV header exists
-ensure_csv_header()
+def run_poll_loop(scraper, cache_manager):
+    """Poll SofaScore forever, processing every live match on each iteration."""
+    while True:
+        try:
+            logger.debug("[%s] Fetching live events from SofaScore API...", current_timestamp())
+            
+            # Fetch all live tennis events
+            events = fetch_live_events(scraper)
+            logger.debug("  Found %s live event(s)", len(events))
+            
+            if len(events) == 0:
+                logger.info("[%s] No live matches currently. Waiting...", current_timestamp())
+                time.sleep(config.POLL_INTERVAL_SECONDS)
+                continue
+            
+            # Process each event (sequentially or on the worker pool, see config.CONCURRENT_PROCESSING)
+            matches_checked, matches_qualified, matches_skipped = process_matches(events, scraper, cache_manager)
+            
+            # Cleanup old cache entries
+            live_match_ids = {event.get("id") for event in events}
+            cache_manager.cleanup_old_matches(live_match_ids)
+            
+            # Poll faster while any match is close to an alert
+            delay, tier_counts = plan_next_poll(events)
+            log_poll_summary(cache_manager, matches_checked, matches_qualified, matches_skipped, delay, tier_counts)
+            
+            # Wait before next poll
+            time.sleep(delay)
+        
+        except Exception as e:
+            logger.exception("[%s] Error in main loop: %s", current_timestamp(), e)
+            time.sleep(config.POLL_INTERVAL_SECONDS)
+            continue
 
-print("Starting live match monitoring...")
-print("=" * 60)
 
-while True:
-    try:
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] Fetching live events from SofaScore API...")
+def run_replay_loop(scraper, cache_manager, speed):
+    """
+    Process every poll of a recording through the normal processing path.
+    
+    Args:
+        scraper: ReplayScraper
+        cache_manager: CacheManager
+        speed: 1 replays at wall-clock speed, 2 twice as fast, etc.; 0 replays as fast as possible
+    
+    Returns:
+        Number of polls replayed
+    """
+    total = len(scraper.poll_records)
+    previous_time = None
+    polls = 0
+    for poll_time in scraper.polls():
+        if speed > 0 and previous_time is not None:
+            time.sleep(max(0, poll_time - previous_time) / speed)
+        previous_time = poll_time
+        polls += 1
         
-        # Fetch all live tennis events
         events = fetch_live_events(scraper)
-        print(f"  Found {len(events)} live event(s)")
-        
-        if len(events) == 0:
-            print("  No live matches currently. Waiting...")
-            time.sleep(config.POLL_INTERVAL_SECONDS)
+        logger.info("[Replay poll %s/%s] Found %s live event(s)", polls, total, len(events))
+        if not events:
             continue
         
-        matches_checked = 0
-        matches_qualified = 0
-        
-        # Process each event
-        for event in events:
-            matches_checked += 1
-            if process_match(event, scraper, cache_manager, matches_checked):
-                matches_qualified += 1
-        
-        # Cleanup old cache entries
-        live_match_ids = {event.get("id") for event in events}
-        cache_manager.cleanup_old_matches(live_match_ids)
-        
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"\n  Summary: Checked {matches_checked} matches, {matches_qualified} qualified for stats check")
-        print(f"  [{timestamp}] Waiting {config.POLL_INTERVAL_SECONDS} seconds before next poll...")
-        print("=" * 60)
-        
-        # Wait before next poll
-        time.sleep(config.POLL_INTERVAL_SECONDS)
-        
-    except Exception as e:
-        print(f"[{datetime.datetime.now()}] Error in main loop: {e}")
-        import traceback
-        traceback.print_exc()
-        time.sleep(config.POLL_INTERVAL_SECONDS)
-        continue
+        matches_checked, matches_qualified, matches_skipped = process_matches(events, scraper, cache_manager)
+        cache_manager.cleanup_old_matches({event.get("id") for event in events})
+        logger.info("  Summary: Checked %s matches, %s qualified for stats check, %s skipped (unchanged or not due)",
+                    matches_checked, matches_qualified, matches_skipped)
+    return polls
+
+
+def replay(path, speed, output_dir):
+    """
+    Replay a recording made with --record, writing CSV rows and alerts to output_dir.
+    
+    Outputs from a previous replay into the same directory are replaced, so two
+    output directories can be diffed directly. Time is read from the recording
+    (see ReplayScraper.clock), so replaying the same recording twice gives
+    byte-identical outputs, CSV Timestamp column included.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    config.OUTPUT_CSV = os.path.join(output_dir, "tennis_dawgs.csv")
+    config.OUTPUT_SQLITE = os.path.join(output_dir, "tennis_dawgs.db")
+    config.SNAPSHOTS_DIR = os.path.join(output_dir, "snapshots")
+    config.MARKET_RESOLUTIONS_FILE = os.path.join(output_dir, "market_resolutions.json")
+    alerts_path = os.path.join(output_dir, "alerts.jsonl")
+    stale_outputs = [config.OUTPUT_CSV, config.OUTPUT_SQLITE, alerts_path]
+    stale_outputs += glob.glob(os.path.join(config.SNAPSHOTS_DIR, "snapshots-*"))
+    for stale_path in stale_outputs:
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+    
+    # Alerts are captured by the replay scraper, never sent; it only needs a configured bot
+    if not config.TELEGRAM_BOT_TOKEN or not config.TELEGRAM_CHAT_ID:
+        config.TELEGRAM_BOT_TOKEN = "replay"
+        config.TELEGRAM_CHAT_ID = "0"
+    
+    scraper = ReplayScraper(path, alerts_path)
+    scraper.write_market_resolutions(config.MARKET_RESOLUTIONS_FILE)
+    logger.info("Replaying %s poll(s) from %s...", len(scraper.poll_records), path)
+    
+    cache_manager = CacheManager(clock=scraper.clock)
+    ensure_csv_header()
+    try:
+        polls = run_replay_loop(scraper, cache_manager, speed)
+    finally:
+        close_match_log()
+        close_snapshots()
+        cache_manager.market_resolver.flush()
+    
+    logger.info("✓ Replayed %s poll(s): CSV rows in %s, alerts in %s", polls, config.OUTPUT_CSV, alerts_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Monitor live tennis matches and send Telegram alerts.")
+    parser.add_argument("--record", metavar="PATH", help="Append every API response to a JSONL recording")
+    parser.add_argument("--replay", metavar="PATH", help="Replay a recording instead of polling live")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Replay speed: 1 = wall clock, 2 = twice as fast, 0 = as fast as possible (default)")
+    parser.add_argument("--replay-output", metavar="DIR", default="data/replay",
+                        help="Directory for replay CSV rows and alerts (default: data/replay)")
+    parser.add_argument("--log-level", default=config.LOG_LEVEL,
+                        help=f"DEBUG shows every match, INFO only poll summaries and alerts (default: {config.LOG_LEVEL})")
+    parser.add_argument("--log-format", default=config.LOG_FORMAT, choices=["console", "compact", "json"],
+                        help=f"Log output format (default: {config.LOG_FORMAT})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(args.log_level, args.log_format)
+    if args.replay:
+        replay(args.replay, args.speed, args.replay_output)
+        return
+    
+    # Create a CloudScraper session wrapped with timeouts, retries and latency counters
+    scraper = SofaScoreClient(cloudscraper.create_scraper())
+    if args.record:
+        # The async loop fetches through aiohttp, which the recorder cannot see
+        config.ASYNC_MODE = False
+        scraper = RecordingScraper(scraper, args.record)
+        logger.info("Recording API responses to %s", args.record)
+    
+    # Initialize cache manager
+    cache_manager = CacheManager()
+    
+    # Ensure CSV header exists
+    ensure_csv_header()
+    
+    # Turn SIGTERM into a normal exit so queued alerts and buffered CSV rows are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    logger.info("Starting live match monitoring...")
+    logger.debug("=" * 60)
+    
+    if config.METRICS_ENABLED:
+        start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+    
+    # Send Telegram alerts from a background thread
+    if config.TELEGRAM_DISPATCH_QUEUE:
+        start_dispatcher(scraper, cache_manager)
+    
+    try:
+        if config.ASYNC_MODE:
+            asyncio.run(run_async_poll_loop(scraper, cache_manager))
+        else:
+            run_poll_loop(scraper, cache_manager)
+    finally:
+        stop_dispatcher(timeout=config.TELEGRAM_SHUTDOWN_TIMEOUT_SECONDS)
+        close_match_log()
+        close_snapshots()
+        cache_manager.market_resolver.flush()
+        if args.record:
+            scraper.close()
+
 
+if __name__ == "__main__":
+    main()
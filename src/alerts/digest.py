@@ -0,0 +1,76 @@
+import threading
+import config
+
+# Section order and titles in a digest message
+ALERT_TYPE_TITLES = {
+    "tiebreak": "⚡ Tiebreak Alerts",
+    "break": "🔴 Break Alerts",
+    "one_one": "🎾 1-1 Sets Alerts",
+}
+
+DIGEST_SEPARATOR = "\n\n—————\n\n"
+
+
+class AlertDigest:
+    """Collects the alerts fired during one poll so they can be sent as a few combined messages."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._alerts = []  # (alert_type, match_id, alert_key, message)
+    
+    def add(self, alert_type, match_id, alert_key, message):
+        with self._lock:
+            self._alerts.append((alert_type, match_id, alert_key, message))
+    
+    def contains(self, match_id, alert_key):
+        with self._lock:
+            return any(m == match_id and k == alert_key for _, m, k, _ in self._alerts)
+    
+    def drain(self):
+        """Remove and return all collected alerts."""
+        with self._lock:
+            alerts, self._alerts = self._alerts, []
+        return alerts
+
+
+def build_digest_messages(alerts, max_length=None):
+    """
+    Combine alerts into as few Telegram messages as possible.
+    
+    Alerts are grouped by type (in ALERT_TYPE_TITLES order) and then by match,
+    and packed greedily so each message stays within max_length characters
+    (Telegram's 4096 limit by default). Alerts are never split, which keeps
+    their HTML tags balanced.
+    
+    Returns:
+        List of (message, [(match_id, alert_key), ...]) tuples
+    """
+    max_length = config.TELEGRAM_MAX_MESSAGE_LENGTH if max_length is None else max_length
+    if len(alerts) == 1:
+        alert_type, match_id, alert_key, message = alerts[0]
+        return [(message, [(match_id, alert_key)])]
+    
+    type_order = list(ALERT_TYPE_TITLES)
+    ordered = sorted(
+        alerts,
+        key=lambda a: (type_order.index(a[0]) if a[0] in type_order else len(type_order), str(a[1]))
+    )
+    
+    # Leave room for the "📋 Alert Digest (i/n)" header added below
+    budget = max_length - 64
+    chunks = []  # [text, [(match_id, alert_key)], current section type]
+    for alert_type, match_id, alert_key, message in ordered:
+        section = f"<b>{ALERT_TYPE_TITLES.get(alert_type, alert_type)}</b>\n\n"
+        if chunks:
+            text, keys, current_type = chunks[-1]
+            addition = DIGEST_SEPARATOR + (section if alert_type != current_type else "") + message
+            if len(text) + len(addition) <= budget:
+                chunks[-1] = [text + addition, keys + [(match_id, alert_key)], alert_type]
+                continue
+        chunks.append([section + message, [(match_id, alert_key)], alert_type])
+    
+    total = len(chunks)
+    return [
+        (f"📋 <b>Alert Digest</b> ({i}/{total}, {len(keys)} alert{'s' if len(keys) != 1 else ''})\n\n{text}", keys)
+        for i, (text, keys, _) in enumerate(chunks, start=1)
+    ]
@@ -0,0 +1,377 @@
+import json
+import os
+import queue
+import threading
+import time
+import config
+from src.alerts.digest import AlertDigest, build_digest_messages
+from src.alerts.telegram import send_telegram_message
+from src.utils import metrics
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Set by start_dispatcher(); alerts are sent inline while no dispatcher is running
+_dispatcher = None
+
+# Alerts held back until the end of the poll when config.ALERT_DIGEST_MODE is on
+_digest = AlertDigest()
+
+
+class TelegramDispatcher:
+    """
+    Background sender for Telegram alerts.
+    
+    Messages are put on a bounded queue and delivered by a worker thread, so a slow
+    Telegram API no longer holds up match processing. Failed sends are retried
+    with exponential backoff; messages that still fail, or that do not fit in the
+    queue, are appended to a spill file. The worker moves spilled messages back
+    into the queue whenever it has room, and delivered alerts are removed from the
+    file, so it only holds what is still undelivered; it is also re-queued on the
+    next start (dropping messages older than config.TELEGRAM_SPILL_MAX_AGE_SECONDS).
+    A message can carry several alerts (digest mode); each alert's *_alert_sent
+    flag is only set once Telegram confirms delivery, and its final outcome (sent,
+    failed or spilled) is counted in metrics.ALERTS by alert type.
+    """
+    
+    def __init__(self, scraper, cache_manager, maxsize=None, max_retries=None, spill_path=None):
+        self.scraper = scraper
+        self.cache_manager = cache_manager
+        self.max_retries = config.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.spill_path = config.TELEGRAM_SPILL_FILE if spill_path is None else spill_path
+        self.queue = queue.Queue(maxsize=config.TELEGRAM_QUEUE_MAXSIZE if maxsize is None else maxsize)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()  # Guards the spill file; never acquired while holding _lock
+        self._pending = set()  # (match_id, alert_key) queued or being sent
+        self._spilled = set()  # (match_id, alert_key) spilled because the queue was full, waiting for room
+        self._last_failure = None  # time.monotonic() of the last undelivered message
+        self._in_flight = None  # Item the worker is currently sending
+        self._draining = threading.Event()  # Stop once the queue is empty (no room for the stop marker)
+        self._abandoned = threading.Event()  # Set once stop() gave up waiting for the worker
+        self._thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+    
+    def start(self):
+        """Re-queue spilled alerts from a previous run and start the worker thread."""
+        for item in self._load_spill():
+            self.submit(item["message"], [tuple(alert) for alert in item.get("alerts", [])], item.get("types", ()))
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Drain the queue, stop the worker and spill anything that was not delivered.
+        
+        If the worker is still busy after timeout seconds, the message it is sending
+        is spilled along with the rest of the queue and the worker stops before its
+        next attempt (a send already on the wire may still go out).
+        """
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            # No room for the stop marker; the worker stops once it finds the queue empty
+            self._draining.set()
+        self._thread.join(timeout)
+        
+        with self._lock:
+            self._abandoned.set()
+            undelivered = [self._in_flight] if self._thread.is_alive() and self._in_flight is not None else []
+            self._in_flight = None
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    undelivered.append(item)
+        for item in undelivered:
+            self._spill(item)
+    
+    def is_pending(self, match_id, alert_key):
+        """Check if an alert for this match is queued, or spilled for want of room, and not yet delivered."""
+        with self._lock:
+            return (match_id, alert_key) in self._pending or (match_id, alert_key) in self._spilled
+    
+    def submit(self, message, alerts=(), alert_types=()):
+        """
+        Queue a message for delivery.
+        
+        Args:
+            message: HTML message text
+            alerts: (match_id, alert_key) pairs to flag as sent once delivered
+            alert_types: Alert type of each alert, for metrics.ALERTS
+        
+        Returns True if it was queued (or all its alerts are already pending),
+        False if it had to be spilled.
+        """
+        alerts = [tuple(alert) for alert in alerts]
+        item = {"message": message, "alerts": alerts, "types": list(alert_types), "created_at": time.time()}
+        with self._lock:
+            if alerts and all(alert in self._pending or alert in self._spilled for alert in alerts):
+                return True
+            try:
+                self.queue.put_nowait(item)
+                self._pending.update(alerts)
+                return True
+            except queue.Full:
+                self._spilled.update(alerts)
+        logger.warning("    ✗ Telegram queue full, spilling alert to %s", self.spill_path)
+        self._spill(item)
+        return False
+    
+    def _run(self):
+        while True:
+            if not self.queue.full() and not self._abandoned.is_set():
+                self._requeue_spill()
+            try:
+                item = self.queue.get(timeout=1)
+            except queue.Empty:
+                if self._draining.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            with self._lock:
+                abandoned = self._abandoned.is_set()
+                if not abandoned:
+                    self._in_flight = item
+            if abandoned:
+                # stop() timed out and spilled the queue; spill this item with it
+                self._spill(item)
+                return
+            self._deliver(item)
+    
+    def _deliver(self, item):
+        delivered = False
+        for attempt in range(self.max_retries + 1):
+            if self._abandoned.is_set():
+                # stop() gave up waiting and already spilled this item
+                return
+            if send_telegram_message(item["message"], self.scraper):
+                delivered = True
+                break
+            if attempt < self.max_retries:
+                time.sleep(min(config.TELEGRAM_RETRY_BACKOFF_SECONDS * 2 ** attempt, config.TELEGRAM_RETRY_BACKOFF_MAX_SECONDS))
+        
+        if delivered:
+            for match_id, alert_key in item["alerts"]:
+                self.cache_manager.mark_alert_sent(match_id, alert_key)
+            record_outcome(item.get("types", ()), "sent")
+            self._forget_spilled(item["alerts"])
+        else:
+            logger.warning("    ✗ Telegram alert undelivered after %s attempts, spilling to %s", self.max_retries + 1, self.spill_path)
+            record_outcome(item.get("types", ()), "failed")
+            self._last_failure = time.monotonic()
+            self._spill(item)
+        
+        with self._lock:
+            self._pending.difference_update(item["alerts"])
+            if self._in_flight is item:
+                self._in_flight = None
+    
+    def _spill(self, item):
+        """Append an undelivered alert to the spill file."""
+        record_outcome(item.get("types", ()), "spilled")
+        with self._spill_lock:
+            try:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.spill_path, mode='a', encoding='utf-8') as file:
+                    file.write(json.dumps(item) + "\n")
+            except OSError as e:
+                logger.error("    ✗ Could not write Telegram spill file: %s", e)
+    
+    def _read_spill(self):
+        """Return the items in the spill file, in write order. Caller must hold _spill_lock."""
+        if not os.path.exists(self.spill_path):
+            return []
+        items = []
+        try:
+            with open(self.spill_path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    item["alerts"] = [tuple(alert) for alert in item.get("alerts", [])]
+                    items.append(item)
+        except OSError as e:
+            logger.warning("  ⚠ Could not read Telegram spill file: %s", e)
+        return items
+    
+    def _write_spill(self, items):
+        """Replace the spill file with items, removing it when empty. Caller must hold _spill_lock."""
+        try:
+            if not items:
+                if os.path.exists(self.spill_path):
+                    os.remove(self.spill_path)
+                return
+            tmp_path = self.spill_path + ".tmp"
+            with open(tmp_path, mode='w', encoding='utf-8') as file:
+                file.writelines(json.dumps(item) + "\n" for item in items)
+            os.replace(tmp_path, self.spill_path)
+        except OSError as e:
+            logger.error("    ✗ Could not write Telegram spill file: %s", e)
+    
+    def _requeue_spill(self):
+        """
+        Move spilled messages back into the queue while it has room. Messages that
+        failed to send wait config.TELEGRAM_RETRY_BACKOFF_MAX_SECONDS after the last
+        failure; expired messages and those whose alerts are queued again are dropped.
+        """
+        if not os.path.exists(self.spill_path):
+            return
+        if self._last_failure is not None and time.monotonic() - self._last_failure < config.TELEGRAM_RETRY_BACKOFF_MAX_SECONDS:
+            return
+        oldest = time.time() - config.TELEGRAM_SPILL_MAX_AGE_SECONDS
+        with self._spill_lock:
+            items = self._read_spill()
+            remaining = []
+            requeued = 0
+            for item in items:
+                alerts = item["alerts"]
+                with self._lock:
+                    if item.get("created_at", 0) < oldest:
+                        self._spilled.difference_update(alerts)
+                        continue
+                    if alerts and all(alert in self._pending for alert in alerts):
+                        continue
+                    try:
+                        self.queue.put_nowait(item)
+                    except queue.Full:
+                        remaining.append(item)
+                        continue
+                    self._pending.update(alerts)
+                    self._spilled.difference_update(alerts)
+                requeued += 1
+            if len(remaining) != len(items):
+                self._write_spill(remaining)
+        if requeued:
+            logger.info("  Re-queued %s spilled Telegram alert(s)", requeued)
+    
+    def _forget_spilled(self, alerts):
+        """Remove spill file entries whose alerts have all been delivered."""
+        delivered = {tuple(alert) for alert in alerts}
+        if not delivered or not os.path.exists(self.spill_path):
+            return
+        with self._spill_lock:
+            items = self._read_spill()
+            remaining = [item for item in items if not item["alerts"] or not set(item["alerts"]) <= delivered]
+            if len(remaining) != len(items):
+                self._write_spill(remaining)
+    
+    def _load_spill(self):
+        """
+        Read and clear the spill file, keeping the latest message per set of alerts
+        and dropping those older than config.TELEGRAM_SPILL_MAX_AGE_SECONDS.
+        """
+        oldest = time.time() - config.TELEGRAM_SPILL_MAX_AGE_SECONDS
+        with self._spill_lock:
+            spilled = self._read_spill()
+            self._write_spill([])
+        items = {}
+        expired = 0
+        for index, item in enumerate(spilled):
+            if item.get("created_at", 0) < oldest:
+                expired += 1
+                continue
+            items[tuple(item["alerts"]) or index] = item
+        if expired:
+            logger.info("  Dropped %s Telegram alert(s) older than %ss from %s", expired,
+                        config.TELEGRAM_SPILL_MAX_AGE_SECONDS, self.spill_path)
+        if items:
+            logger.info("  Re-queueing %s undelivered Telegram alert(s) from %s", len(items), self.spill_path)
+        return list(items.values())
+
+
+def start_dispatcher(scraper, cache_manager):
+    """Start the background dispatcher used by dispatch_alert()."""
+    global _dispatcher
+    _dispatcher = TelegramDispatcher(scraper, cache_manager)
+    _dispatcher.start()
+    return _dispatcher
+
+
+def stop_dispatcher(timeout=None):
+    """Stop the background dispatcher, spilling undelivered alerts."""
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop(timeout)
+        _dispatcher = None
+
+
+def is_alert_pending(match_id, alert_key):
+    """Check if an alert is waiting in the poll digest or the dispatcher queue."""
+    if _digest.contains(match_id, alert_key):
+        return True
+    return _dispatcher is not None and _dispatcher.is_pending(match_id, alert_key)
+
+
+def record_outcome(alert_types, outcome):
+    """Count the outcome of a message in metrics.ALERTS once per alert type it carries."""
+    for alert_type in alert_types:
+        metrics.ALERTS.inc(type=alert_type, outcome=outcome)
+
+
+def send_message(message, alerts, scraper, cache_manager, alert_types=()):
+    """
+    Send one message through the background dispatcher, or inline if none is running.
+    Flags every (match_id, alert_key) in alerts as sent once delivered, and counts
+    the outcome of each of alert_types in metrics.ALERTS.
+    """
+    if _dispatcher is not None:
+        return _dispatcher.submit(message, alerts, alert_types)
+    
+    if send_telegram_message(message, scraper):
+        for match_id, alert_key in alerts:
+            cache_manager.mark_alert_sent(match_id, alert_key)
+        record_outcome(alert_types, "sent")
+        return True
+    record_outcome(alert_types, "failed")
+    return False
+
+
+def dispatch_alert(message, scraper, cache_manager, match_id, alert_key, alert_type):
+    """
+    Deliver an alert.
+    
+    In digest mode (config.ALERT_DIGEST_MODE) alerts whose type is not listed in
+    config.DIGEST_URGENT_ALERT_TYPES are held until flush_alert_digest() runs at
+    the end of the poll. Everything else is sent right away.
+    
+    Returns:
+        True if the alert was queued, held for the digest or sent
+    """
+    if config.ALERT_DIGEST_MODE and alert_type not in config.DIGEST_URGENT_ALERT_TYPES:
+        _digest.add(alert_type, match_id, alert_key, message)
+        metrics.ALERTS.inc(type=alert_type, outcome="held")
+        logger.info("  Alert %s for match %s: held for digest", alert_type, match_id,
+                    extra={"event": "alert", "alert_type": alert_type, "match_id": match_id, "outcome": "held"})
+        return True
+    queued = _dispatcher is not None
+    delivered = send_message(message, [(match_id, alert_key)], scraper, cache_manager, [alert_type])
+    # send_message counts the final outcome (sent, failed or spilled); only the queueing is counted here
+    outcome = ("queued" if delivered else "spilled") if queued else ("sent" if delivered else "failed")
+    if outcome == "queued":
+        metrics.ALERTS.inc(type=alert_type, outcome=outcome)
+    logger.info("  Alert %s for match %s: %s", alert_type, match_id, outcome,
+                extra={"event": "alert", "alert_type": alert_type, "match_id": match_id, "outcome": outcome})
+    return delivered
+
+
+def flush_alert_digest(scraper, cache_manager):
+    """
+    Send the alerts collected during this poll as combined digest messages.
+    Returns the number of messages sent or queued.
+    """
+    alerts = _digest.drain()
+    if not alerts:
+        return 0
+    
+    messages = build_digest_messages(alerts)
+    logger.info("  Sending alert digest: %s alert(s) in %s message(s)", len(alerts), len(messages))
+    alert_types = {(match_id, alert_key): alert_type for alert_type, match_id, alert_key, _ in alerts}
+    sent = 0
+    for message, keys in messages:
+        if send_message(message, keys, scraper, cache_manager, [alert_types[key] for key in keys]):
+            sent += 1
+    return sent
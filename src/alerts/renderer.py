@@ -0,0 +1,125 @@
+from src.analysis.player_comparison import determine_better_player
+from src.utils import metrics
+from src.utils.helpers import current_timestamp
+
+# Layout shared by every alert; {title}, {score} and {details} are filled per alert type
+MESSAGE_LAYOUT = """{title}
+
+<b>{{player1}}</b> {{p1_rank_str}} vs <b>{{player2}}</b> {{p2_rank_str}}
+Tournament: {{tour_type}}
+Score: {score}
+Match ID: {{match_id}}
+Odds: {{starting_odds}} → {{odds_str}} (Starting → Live)
+
+{details}<b>Key Stats:</b>
+{{key_stats}}
+
+Time: {{timestamp}}"""
+
+# alert type -> (title, score line, details section)
+ALERT_LAYOUTS = {
+    "one_one": (
+        "🎾 <b>1-1 Sets Alert</b>",
+        "{sets_score}, {games_score} (Current set: {current_set_games_str})",
+        ""
+    ),
+    "break": (
+        "🔴 <b>BREAK ALERT - Player Down a Set Breaks Serve!</b>",
+        "{sets_score}, 2nd Set: {set_score}",
+        "<b>Break Details:</b>\n"
+        "• {breaking_player} was down {breaking_player_sets} sets\n"
+        "• Broke serve in 2nd set at {set_score}\n\n"
+    ),
+    "tiebreak": (
+        "⚡ <b>TIEBREAK ALERT - 3rd Set Tiebreak!</b>",
+        "{sets_score}, 3rd Set: {set_score} (TIEBREAK)",
+        "<b>Tiebreak Details:</b>\n"
+        "• Match is 1-1 sets, going to tiebreak in 3rd set\n"
+        "• Current 3rd set score: {set_score}\n\n"
+    ),
+}
+
+# Full message template per alert type, built once at import
+ALERT_TEMPLATES = {
+    alert_type: MESSAGE_LAYOUT.format(title=title, score=score, details=details)
+    for alert_type, (title, score, details) in ALERT_LAYOUTS.items()
+}
+
+PLAYER_STATS_TEMPLATE = """• <b>{label} ({name}) {emoji}:</b>
+  - Service points won: {service_pct}% ({player.service_points_won}/{player.service_points_total})
+  - Return points won: {return_pct}% ({player.receiver_points_won}/{player.return_points_total})
+  - Total points won: {total_pct}% ({player.total_points}/{total_points_played})
+  - Break points saved: {bp_saved_pct}% ({player.bp_saved}/{player.bp_faced})
+  - Break points converted: {player.bp_converted}
+  - Games won: {player.games_won}"""
+
+
+def render_key_stats(player1, player2, match_stats):
+    """Render the 'Key Stats' block of both players, marking the better one with 🟢."""
+    better_player = determine_better_player(match_stats.p1, match_stats.p2)
+    total_points_played = match_stats.total_points_played
+    blocks = []
+    for label, name, player in (("P1", player1, match_stats.p1), ("P2", player2, match_stats.p2)):
+        blocks.append(PLAYER_STATS_TEMPLATE.format(
+            label=label,
+            name=name,
+            emoji="🟢" if better_player == label.lower() else "",
+            player=player,
+            service_pct=int(player.service_pts_won_pct*100),
+            return_pct=int(player.return_pts_won_pct*100),
+            total_pct=int(player.total_pts_won_pct*100),
+            bp_saved_pct=int(player.bp_saved_pct*100),
+            total_points_played=total_points_played
+        ))
+    return "\n\n".join(blocks)
+
+
+def get_key_stats(match_id, player1, player2, match_stats, key_stats_cache=None):
+    """
+    Return the rendered key stats block for a match, reusing the last one rendered
+    while the match's statistics are unchanged.
+    
+    Args:
+        key_stats_cache: Optional KeyStatsCache, e.g. cache_manager.key_stats_cache
+    """
+    if key_stats_cache is None:
+        return render_key_stats(player1, player2, match_stats)
+    
+    block = key_stats_cache.get(match_id, match_stats.values, player1, player2)
+    if block is not None:
+        metrics.CACHE_LOOKUPS.inc(cache="key_stats", result="hit")
+        return block
+    
+    metrics.CACHE_LOOKUPS.inc(cache="key_stats", result="miss")
+    block = render_key_stats(player1, player2, match_stats)
+    key_stats_cache.store(match_id, match_stats.values, player1, player2, block)
+    return block
+
+
+def render_alert(alert_type, player1, player2, p1_ranking, p2_ranking, tour_type, match_id,
+                 starting_odds, odds_str, match_stats, key_stats_cache=None, timestamp=None, **fields):
+    """
+    Render a Telegram alert message.
+    
+    Args:
+        alert_type: Key of ALERT_TEMPLATES ('one_one', 'break' or 'tiebreak')
+        key_stats_cache: Optional per-match cache for the key stats block (see get_key_stats)
+        timestamp: Alert time shown in the message; defaults to current_timestamp()
+        **fields: Values for the alert type's score and details lines, e.g. sets_score, set_score
+    
+    Returns:
+        Message HTML
+    """
+    return ALERT_TEMPLATES[alert_type].format(
+        player1=player1,
+        player2=player2,
+        p1_rank_str=f"#{p1_ranking}" if p1_ranking else "N/A",
+        p2_rank_str=f"#{p2_ranking}" if p2_ranking else "N/A",
+        tour_type=tour_type,
+        match_id=match_id,
+        starting_odds=starting_odds,
+        odds_str=odds_str,
+        key_stats=get_key_stats(match_id, player1, player2, match_stats, key_stats_cache),
+        timestamp=timestamp or current_timestamp(),
+        **fields
+    )
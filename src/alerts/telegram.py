@@ -1,52 +1,85 @@
+import time
 import config
+from src.utils import metrics
+from src.utils.logger import get_logger
 
+logger = get_logger(__name__)
 
-def send_telegram_message(message, scraper):
+
+def build_telegram_request(message):
     """
-    Send a message via Telegram bot.
-    Configuration is read from config module.
+    Build the sendMessage URL and payload for a message.
+    Returns (url, payload), or (None, None) if Telegram is not configured.
     """
     bot_token = config.TELEGRAM_BOT_TOKEN
     chat_id = config.TELEGRAM_CHAT_ID
     
     # Skip if Telegram is not configured
     if not bot_token or not chat_id:
-        print(f"    ⚠ Telegram not configured (bot_token or chat_id missing)")
+        logger.warning("    ⚠ Telegram not configured (bot_token or chat_id missing)")
+        return None, None
+    
+    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    # Convert chat_id to int if it's a string
+    chat_id_int = int(chat_id) if isinstance(chat_id, str) and chat_id.isdigit() else chat_id
+    payload = {
+        "chat_id": chat_id_int,
+        "text": message,
+        "parse_mode": "HTML"
+    }
+    return url, payload
+
+
+def handle_telegram_response(status_code, result, text):
+    """
+    Check a sendMessage response.
+    
+    Args:
+        status_code: HTTP status code
+        result: Decoded JSON body, or None if it could not be decoded
+        text: Raw response body
+    
+    Returns:
+        True if Telegram accepted the message, False otherwise
+    """
+    if status_code == 200 and result is not None:
+        if result.get("ok"):
+            logger.debug("    ✓ Telegram message sent successfully")
+            return True
+        error_desc = result.get("description", "Unknown error")
+        logger.warning("    ✗ Telegram API error: %s", error_desc)
         return False
     
+    if result is not None:
+        error_desc = result.get("description", text)
+        logger.warning("    ✗ Telegram API error (%s): %s", status_code, error_desc)
+    else:
+        logger.warning("    ✗ Telegram API error (%s): %s", status_code, text)
+    return False
+
+
+def send_telegram_message(message, scraper):
+    """
+    Send a message via Telegram bot.
+    Configuration is read from config module.
+    """
+    url, payload = build_telegram_request(message)
+    if url is None:
+        return False
+    
+    start = time.perf_counter()
+    status = "error"
     try:
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        # Convert chat_id to int if it's a string
-        chat_id_int = int(chat_id) if isinstance(chat_id, str) and chat_id.isdigit() else chat_id
-        payload = {
-            "chat_id": chat_id_int,
-            "text": message,
-            "parse_mode": "HTML"
-        }
-        
         # Use cloudscraper to send the request
         response = scraper.post(url, json=payload, timeout=10)
-        
-        if response.status_code == 200:
+        status = response.status_code
+        try:
             result = response.json()
-            if result.get("ok"):
-                print(f"    ✓ Telegram message sent successfully")
-                return True
-            else:
-                error_desc = result.get("description", "Unknown error")
-                print(f"    ✗ Telegram API error: {error_desc}")
-                return False
-        else:
-            try:
-                error_data = response.json()
-                error_desc = error_data.get("description", response.text)
-                print(f"    ✗ Telegram API error ({response.status_code}): {error_desc}")
-            except:
-                print(f"    ✗ Telegram API error ({response.status_code}): {response.text}")
-            return False
+        except:
+            result = None
+        return handle_telegram_response(response.status_code, result, response.text)
     except Exception as e:
-        print(f"    ✗ Error sending Telegram message: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("    ✗ Error sending Telegram message: %s", e)
         return False
-
+    finally:
+        metrics.record_request("telegram", "sendMessage", status, time.perf_counter() - start)
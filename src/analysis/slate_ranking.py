@@ -0,0 +1,99 @@
+import numpy as np
+from src.processors.match_stats import STAT_NAMES
+
+# (statistic, weight) behind the stats-dominance score; a negative weight means lower
+# is better. Unit weights give every metric one vote, like determine_better_player.
+DOMINANCE_WEIGHTS = (
+    ('first_serve_pct', 1.0),
+    ('second_serve_pts_pct', 1.0),
+    ('opp_pts_on_serve', -1.0),
+    ('bp_saved_pct', 1.0),
+    ('bp_converted', 1.0),
+    ('total_points', 1.0),
+    ('service_points_won', 1.0),
+    ('receiver_points_won', 1.0),
+    ('games_won', 1.0),
+    ('aces', 1.0),
+    ('double_faults', -1.0),
+)
+
+_STAT_COLUMN = {name: index for index, name in enumerate(STAT_NAMES)}
+_WEIGHTS = np.array([weight for _, weight in DOMINANCE_WEIGHTS])
+_TOTAL_WEIGHT = np.abs(_WEIGHTS).sum()
+
+
+def stack_player_metrics(stats_matrix):
+    """
+    Build the (matches, metrics) arrays of both players from stacked MatchStats values.
+    
+    Args:
+        stats_matrix: (matches, 28) array of MatchStats.values rows
+    
+    Returns:
+        (p1_metrics, p2_metrics), columns in DOMINANCE_WEIGHTS order
+    """
+    per_player = (stats_matrix[:, 0::2], stats_matrix[:, 1::2])  # columns in STAT_NAMES order
+    stacked = []
+    for player in per_player:
+        faced = player[:, _STAT_COLUMN['bp_faced']]
+        columns = []
+        for name, _ in DOMINANCE_WEIGHTS:
+            if name == 'bp_saved_pct':
+                saved = player[:, _STAT_COLUMN['bp_saved']]
+                columns.append(np.divide(saved, faced, out=np.zeros_like(saved), where=faced > 0))
+            else:
+                columns.append(player[:, _STAT_COLUMN[name]])
+        stacked.append(np.column_stack(columns))
+    return stacked[0], stacked[1]
+
+
+def dominance_scores(p1_metrics, p2_metrics):
+    """
+    Weighted share of metrics P1 leads, minus the share P2 leads: 1 means P1 is
+    ahead on every metric, -1 P2, 0 even.
+    """
+    return np.sign(p1_metrics - p2_metrics) @ _WEIGHTS / _TOTAL_WEIGHT
+
+
+def rank_slate(entries):
+    """
+    Rank matches by how far their stats dominance diverges from the market.
+    
+    The dominance score is mapped to a P1 "stats probability" of (1 + score) / 2
+    and compared with Polymarket's P1 probability (normalised so both outcomes
+    sum to 1). Everything is computed in one pass over the whole slate.
+    
+    Args:
+        entries: List of (match_id, player1, player2, MatchStats, (p1_prob, p2_prob))
+    
+    Returns:
+        List of dicts (match_id, player1, player2, dominance, stats_p1_prob,
+        market_p1_prob, divergence, value_side), largest absolute divergence first.
+        value_side is the player the stats rate higher than the market does
+        ('p1', 'p2' or None if they agree).
+    """
+    if not entries:
+        return []
+    
+    stats_matrix = np.array([entry[3].values for entry in entries], dtype=float)
+    odds = np.array([entry[4] for entry in entries], dtype=float)
+    
+    dominance = dominance_scores(*stack_player_metrics(stats_matrix))
+    stats_p1_prob = (1 + dominance) / 2
+    market_p1_prob = odds[:, 0] / odds.sum(axis=1)
+    divergence = stats_p1_prob - market_p1_prob
+    order = np.argsort(-np.abs(divergence), kind="stable")
+    
+    return [
+        {
+            'match_id': entries[i][0],
+            'player1': entries[i][1],
+            'player2': entries[i][2],
+            'dominance': float(dominance[i]),
+            'stats_p1_prob': float(stats_p1_prob[i]),
+            'market_p1_prob': float(market_p1_prob[i]),
+            'divergence': float(divergence[i]),
+            'value_side': 'p1' if divergence[i] > 0 else 'p2' if divergence[i] < 0 else None
+        }
+        for i in order
+    ]
@@ -0,0 +1,85 @@
+import aiohttp
+import config
+from src.api.rate_limiter import rate_limiter
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Browser-like headers; SofaScore rejects requests without a user agent
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+}
+
+
+def create_async_session():
+    """Create an aiohttp session shared by all async API calls."""
+    connector = aiohttp.TCPConnector(limit=config.ASYNC_MAX_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=config.ASYNC_REQUEST_TIMEOUT_SECONDS)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS)
+
+
+def request_key(url, params=None):
+    """Build a hashable key for a GET request."""
+    return url, tuple(sorted(params.items())) if params else ()
+
+
+class PrefetchedResponse:
+    """Minimal stand-in for a requests.Response built from an already downloaded body."""
+    
+    def __init__(self, status_code, data, text=""):
+        self.status_code = status_code
+        self._data = data
+        self.text = text
+    
+    def json(self):
+        if self._data is None:
+            raise ValueError("Response body is not JSON")
+        return self._data
+
+
+class PrefetchedScraper:
+    """
+    Scraper that answers GET requests from responses downloaded ahead of time.
+    
+    Lets the synchronous processing code run on data fetched concurrently by the
+    async poll loop. Anything that was not prefetched (and every POST) falls back
+    to the wrapped scraper.
+    """
+    
+    def __init__(self, responses, fallback):
+        self.responses = responses
+        self.fallback = fallback
+    
+    def get(self, url, params=None, **kwargs):
+        response = self.responses.get(request_key(url, params))
+        if response is not None:
+            return response
+        return self.fallback.get(url, params=params, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.fallback.post(url, **kwargs)
+
+
+async def prefetch_get(session, url, params=None):
+    """
+    Download a GET response for later use by PrefetchedScraper.
+    Returns (key, PrefetchedResponse), or (key, None) if the request failed.
+    """
+    key = request_key(url, params)
+    try:
+        await rate_limiter.acquire_async(url)
+        async with session.get(url, params=params) as response:
+            if rate_limiter.observe(url, response.status, response.headers):
+                # Leave it to the synchronous fallback, which waits out Retry-After
+                return key, None
+            text = await response.text()
+            try:
+                data = await response.json(content_type=None)
+            except Exception:
+                data = None
+            return key, PrefetchedResponse(response.status, data, text)
+    except Exception as e:
+        logger.warning("    ✗ Prefetch failed for %s: %s", url, e)
+        return key, None
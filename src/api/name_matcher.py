@@ -0,0 +1,194 @@
+import re
+import unicodedata
+from functools import lru_cache
+import config
+
+# Letters NFKD does not decompose into an ASCII base letter
+_SPECIAL_LETTERS = str.maketrans({
+    'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'þ': 'th'
+})
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Share of a player's score carried by the surname; the rest comes from given names
+SURNAME_WEIGHT = 0.75
+# Trigram similarity below which two name tokens are treated as different names
+MIN_TOKEN_SIMILARITY = 0.8
+# Score given to an initial ('n') matching a given name ('novak')
+INITIAL_SIMILARITY = 0.9
+
+
+@lru_cache(maxsize=8192)
+def name_key(name):
+    """
+    Normalised form of a name or title: accents stripped, lower case, punctuation
+    and hyphens turned into single spaces ('Félix Auger-Aliassime' -> 'felix auger aliassime').
+    """
+    text = unicodedata.normalize("NFKD", str(name).casefold().translate(_SPECIAL_LETTERS))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=8192)
+def name_tokens(name):
+    """Tokens of name_key(name) as a tuple."""
+    return tuple(name_key(name).split())
+
+
+@lru_cache(maxsize=8192)
+def split_name(name):
+    """
+    Split a player name into (surname, given names).
+    
+    The surname is the last token longer than one letter, so both 'Francisco Cerundolo'
+    and 'Cerundolo F.' give ('cerundolo', ('francisco',) or ('f',)).
+    Returns (None, ()) for names without such a token.
+    """
+    tokens = name_tokens(name)
+    for i in range(len(tokens) - 1, -1, -1):
+        if len(tokens[i]) > 1:
+            return tokens[i], tokens[:i] + tokens[i + 1:]
+    return None, ()
+
+
+@lru_cache(maxsize=8192)
+def token_trigrams(token):
+    """Character trigrams of a token, padded so short tokens still have some."""
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def token_similarity(a, b):
+    """
+    Similarity of two name tokens between 0 and 1: exact match 1, an initial and the
+    name it abbreviates INITIAL_SIMILARITY, otherwise the Dice coefficient of their
+    trigrams if it reaches MIN_TOKEN_SIMILARITY (catches 'djokovic' / 'djokovich').
+    """
+    if a == b:
+        return 1.0
+    if len(a) == 1 or len(b) == 1:
+        return INITIAL_SIMILARITY if a[0] == b[0] else 0.0
+    grams_a = token_trigrams(a)
+    grams_b = token_trigrams(b)
+    similarity = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+    return similarity if similarity >= MIN_TOKEN_SIMILARITY else 0.0
+
+
+@lru_cache(maxsize=16384)
+def name_score(player, candidate):
+    """
+    How confidently a title or outcome refers to a player, between 0 and 1.
+    
+    The player's surname must appear in the candidate (fuzzily). Given names then
+    lift the score from SURNAME_WEIGHT towards 1, so 'Djokovic' scores 0.75 for
+    'Novak Djokovic' and 'Novak Djokovic' scores 1.
+    
+    Args:
+        player: SofaScore player name
+        candidate: Polymarket event title or market outcome
+    """
+    surname, given = split_name(player)
+    tokens = name_tokens(candidate)
+    if surname is None or not tokens:
+        return 0.0
+    
+    surname_score = max((token_similarity(surname, token) for token in tokens if len(token) > 1), default=0.0)
+    if not surname_score:
+        return 0.0
+    if not given:
+        return surname_score
+    
+    given_score = sum(max(token_similarity(name, token) for token in tokens) for name in given) / len(given)
+    return surname_score * (SURNAME_WEIGHT + (1 - SURNAME_WEIGHT) * given_score)
+
+
+@lru_cache(maxsize=8192)
+def candidate_trigrams(candidate):
+    """Trigrams of all tokens of a title or outcome."""
+    return frozenset().union(*(token_trigrams(token) for token in name_tokens(candidate)))
+
+
+class NameIndex:
+    """
+    Token index over candidate strings (event titles or market outcomes), so a
+    player is only scored against candidates containing their surname. Candidates
+    sharing at least half of the surname's trigrams are tried only when no
+    candidate contains it exactly (misspellings and transliterations).
+    """
+    
+    def __init__(self, candidates):
+        self.candidates = [str(candidate) for candidate in candidates]
+        self._postings = {}  # token -> candidate indices
+        for i, candidate in enumerate(self.candidates):
+            for token in name_tokens(candidate):
+                self._postings.setdefault(token, []).append(i)
+    
+    def lookup(self, surname):
+        """Indices of the candidates that could contain a surname."""
+        exact = self._postings.get(surname)
+        if exact:
+            return exact
+        grams = token_trigrams(surname)
+        return [i for i, candidate in enumerate(self.candidates)
+                if len(grams & candidate_trigrams(candidate)) * 2 >= len(grams)]
+    
+    def scores(self, player, min_score=None):
+        """
+        Score every candidate that could name the player.
+        
+        Args:
+            player: SofaScore player name
+            min_score: Drop candidates below this score (default config.NAME_MATCH_MIN_SCORE)
+        
+        Returns:
+            Dict of candidate index -> name_score
+        """
+        if min_score is None:
+            min_score = config.NAME_MATCH_MIN_SCORE
+        surname, _ = split_name(player)
+        if surname is None:
+            return {}
+        
+        scores = {}
+        for i in self.lookup(surname):
+            score = name_score(player, self.candidates[i])
+            if score >= min_score:
+                scores[i] = score
+        return scores
+    
+    def best_match(self, player, min_score=None):
+        """Return (index, score) of the best candidate for a player, or (None, 0.0) if none qualifies."""
+        scores = self.scores(player, min_score)
+        if not scores:
+            return None, 0.0
+        best = max(scores, key=lambda i: (scores[i], -i))
+        return best, scores[best]
+
+
+def match_players(candidates, player1, player2, min_score=None):
+    """
+    Assign two candidates (e.g. a market's outcomes) to the two players.
+    
+    Each player gets a different candidate, choosing the pair with the highest
+    combined score, so 'Francisco Cerundolo' and 'Juan Manuel Cerundolo' are not
+    both given the same outcome.
+    
+    Returns:
+        (p1_index, p2_index, score), or None if either player has no candidate
+        scoring at least min_score (default config.NAME_MATCH_MIN_SCORE)
+    """
+    return _match_players(tuple(str(candidate) for candidate in candidates), player1, player2,
+                          config.NAME_MATCH_MIN_SCORE if min_score is None else min_score)
+
+
+@lru_cache(maxsize=4096)
+def _match_players(candidates, player1, player2, min_score):
+    index = NameIndex(candidates)
+    p1_scores = index.scores(player1, min_score)
+    p2_scores = index.scores(player2, min_score)
+    
+    best = None
+    for i, p1_score in sorted(p1_scores.items()):
+        for j, p2_score in sorted(p2_scores.items()):
+            if i != j and (best is None or p1_score + p2_score > best[2]):
+                best = (i, j, p1_score + p2_score)
+    return best
@@ -0,0 +1,114 @@
+import asyncio
+import datetime
+import email.utils
+import threading
+import time
+from urllib.parse import urlsplit
+import config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date).
+    Returns the delay in seconds, or None if the value is missing or invalid.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket that queues callers instead of rejecting them.
+    
+    Each reservation takes a token immediately and returns how long the caller
+    must wait for it. Tokens may go negative: the deficit is the queue of
+    requests already promised a slot, so waits grow in order of arrival.
+    """
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self):
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def pause(self, seconds):
+        """Hold back all requests for at least the given number of seconds (e.g. after a 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class RateLimiter:
+    """Per-host token buckets shared by every outbound call."""
+    
+    def __init__(self, limits, default_limit):
+        self.limits = limits
+        self.default_limit = default_limit
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, url):
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.limits.get(host, self.default_limit)
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+    
+    def acquire(self, url):
+        """Block until a request to url's host fits in its budget."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self, url):
+        """Async variant of acquire."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def observe(self, url, status_code, headers):
+        """
+        Check a response for rate limiting. On 429 (or 503 with Retry-After) the
+        host is paused for Retry-After seconds, or RATE_LIMIT_DEFAULT_PAUSE_SECONDS.
+        
+        Returns:
+            True if the request was rate limited and should be retried
+        """
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        if status_code == 429 or (status_code == 503 and retry_after is not None):
+            pause = retry_after if retry_after is not None else config.RATE_LIMIT_DEFAULT_PAUSE_SECONDS
+            logger.warning("    ⚠ Rate limited by %s (%s), pausing %.0fs", urlsplit(url).hostname, status_code, pause)
+            self.bucket(url).pause(pause)
+            return True
+        return False
+
+
+# Shared limiter for SofaScore, Polymarket and Telegram
+rate_limiter = RateLimiter(config.RATE_LIMITS, config.DEFAULT_RATE_LIMIT)
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+import config
+from src.api.async_client import PrefetchedResponse, request_key
+
+
+class RecordingScraper:
+    """
+    Scraper wrapper that appends every GET response to a JSONL recording.
+    
+    The first line is a header holding the market resolutions the run started
+    with; each following line is one response (time, url, params, status, body).
+    POSTs (Telegram) pass through unrecorded. The recording is read back by
+    ReplayScraper.
+    """
+    
+    def __init__(self, scraper, path):
+        self.scraper = scraper
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, mode='a', encoding='utf-8')
+        self._write({"type": "header", "t": time.time(), "market_resolutions": self._read_market_resolutions()})
+    
+    def _read_market_resolutions(self):
+        try:
+            with open(config.MARKET_RESOLUTIONS_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write(self, record):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+    
+    def get(self, url, params=None, **kwargs):
+        response = self.scraper.get(url, params=params, **kwargs)
+        self._write({
+            "type": "response",
+            "t": time.time(),
+            "url": url,
+            "params": params,
+            "status": response.status_code,
+            "text": response.text
+        })
+        return response
+    
+    def post(self, url, **kwargs):
+        return self.scraper.post(url, **kwargs)
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayScraper:
+    """
+    Scraper that serves GET requests from a recording made by RecordingScraper.
+    
+    The recording is split into polls at each live events response. While a
+    poll is replayed, a GET is answered with the most recent recorded response
+    for the same URL and params up to that poll (404 if there is none), so cache
+    timing differences between the recorded and replayed run do not cause misses.
+    POSTs are not sent: Telegram messages are appended to alerts_path and
+    answered with a successful response.
+    """
+    
+    def __init__(self, path, alerts_path):
+        self.header = {}
+        self.poll_records = []
+        self.alerts_path = alerts_path
+        self.now = None
+        self._responses = {}
+        self._lock = threading.Lock()
+        self._load(path)
+    
+    def _load(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("type") == "header":
+                    # A recording file may hold several runs; replay them back to back
+                    if not self.header:
+                        self.header = record
+                    continue
+                if record["url"] == config.SOFASCORE_LIVE_EVENTS_URL or not self.poll_records:
+                    self.poll_records.append([])
+                self.poll_records[-1].append(record)
+        self.now = self.header.get("t") or (self.poll_records[0][0]["t"] if self.poll_records else time.time())
+    
+    def polls(self):
+        """
+        Step through the recorded polls.
+        Yields each poll's recorded time after making its responses current.
+        """
+        for records in self.poll_records:
+            with self._lock:
+                for record in records:
+                    try:
+                        data = json.loads(record["text"])
+                    except (TypeError, ValueError):
+                        data = None
+                    key = request_key(record["url"], record["params"])
+                    self._responses[key] = PrefetchedResponse(record["status"], data, record["text"] or "")
+                self.now = records[0]["t"]
+            yield self.now
+    
+    def clock(self):
+        """
+        Current replay time: the recorded time of the poll being replayed.
+        Passed to CacheManager as its clock, so cache TTLs, tier refresh intervals,
+        backoff schedules and timestamps follow the recorded timeline.
+        """
+        return self.now
+    
+    def get(self, url, params=None, **kwargs):
+        with self._lock:
+            response = self._responses.get(request_key(url, params))
+        if response is None:
+            return PrefetchedResponse(404, None, "Not recorded")
+        return response
+    
+    def post(self, url, **kwargs):
+        payload = kwargs.get("json") or {}
+        record = {"t": self.now, "message": payload.get("text")}
+        with self._lock:
+            with open(self.alerts_path, mode='a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        return PrefetchedResponse(200, {"ok": True}, '{"ok":true}')
+    
+    def write_market_resolutions(self, path):
+        """Write the market resolutions the recorded run started with to path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, mode='w', encoding='utf-8') as f:
+            json.dump(self.header.get("market_resolutions") or {}, f)
+
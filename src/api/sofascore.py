@@ -1,51 +1,283 @@
+import random
+import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
 import config
 import json
+from src.api.rate_limiter import rate_limiter
+from src.utils import metrics
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (connect, read) timeout applied to every SofaScore request
+SOFASCORE_TIMEOUT = (config.SOFASCORE_CONNECT_TIMEOUT_SECONDS, config.SOFASCORE_READ_TIMEOUT_SECONDS)
+
+
+def endpoint_name(url):
+    """Collapse a URL into an endpoint label, e.g. 'api.sofascore.com/api/v1/event/{id}/statistics'."""
+    path = url.split("://", 1)[-1].split("?", 1)[0]
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+
+def resize_connection_pools(session, pool_size):
+    """
+    Resize the connection pools of the adapters already mounted on a session.
+    
+    The adapters are kept rather than replaced: cloudscraper mounts its own
+    CipherSuiteAdapter on https:// and its TLS settings are what get past Cloudflare.
+    """
+    for adapter in getattr(session, "adapters", {}).values():
+        if isinstance(adapter, HTTPAdapter):
+            adapter.poolmanager.clear()
+            adapter.proxy_manager.clear()
+            adapter.init_poolmanager(pool_size, pool_size, block=adapter._pool_block)
+
+
+class SofaScoreClient:
+    """
+    HTTP session wrapper used for all outbound calls.
+    
+    Adds explicit (connect, read) timeouts, a sized keep-alive connection pool,
+    per-host rate limiting (see rate_limiter), jittered exponential retries for
+    GET requests that fail with a connection error, a timeout or a 5xx response,
+    and per-endpoint latency counters.
+    Exposes get/post like the wrapped cloudscraper session, so it can be passed
+    wherever a scraper is expected.
+    """
+    
+    def __init__(self, session, timeout=SOFASCORE_TIMEOUT, max_retries=None, pool_size=None):
+        self.session = session
+        self.timeout = timeout
+        self.max_retries = config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        pool_size = config.HTTP_POOL_SIZE if pool_size is None else pool_size
+        
+        resize_connection_pools(session, pool_size)
+        session.headers["Connection"] = "keep-alive"
+        
+        self._lock = threading.Lock()
+        self.latency = {}  # endpoint -> {'count', 'errors', 'retries', 'total_seconds', 'max_seconds'}
+    
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def request(self, method, url, **kwargs):
+        """
+        Send a request through the shared per-host rate limiter.
+        
+        Rate limited responses (429) are re-queued after their Retry-After pause,
+        up to RATE_LIMIT_MAX_RETRIES times. GETs are also retried on connection
+        errors, timeouts and 5xx responses; POSTs are otherwise sent once so alerts
+        are never duplicated.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = endpoint_name(url)
+        max_retries = self.max_retries if method == "GET" else 0
+        failures = 0
+        rate_limited = 0
+        
+        while True:
+            rate_limiter.acquire(url)
+            retried = failures + rate_limited > 0
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, time.perf_counter() - start, error=True, retried=retried)
+                if failures >= max_retries:
+                    raise
+                self._backoff(failures)
+                failures += 1
+                continue
+            
+            elapsed = time.perf_counter() - start
+            if rate_limiter.observe(url, response.status_code, response.headers) and rate_limited < config.RATE_LIMIT_MAX_RETRIES:
+                self._record(endpoint, elapsed, error=True, retried=retried)
+                rate_limited += 1
+                continue
+            
+            failed = response.status_code >= 500
+            self._record(endpoint, elapsed, error=failed, retried=retried)
+            if failed and failures < max_retries:
+                self._backoff(failures)
+                failures += 1
+                continue
+            return response
+    
+    def _backoff(self, attempt):
+        """Sleep for a jittered exponential delay before the next attempt."""
+        delay = min(config.HTTP_RETRY_BACKOFF_SECONDS * 2 ** attempt, config.HTTP_RETRY_BACKOFF_MAX_SECONDS)
+        time.sleep(delay * random.uniform(0.5, 1.5))
+    
+    def _record(self, endpoint, elapsed, error=False, retried=False):
+        with self._lock:
+            counters = self.latency.setdefault(
+                endpoint, {'count': 0, 'errors': 0, 'retries': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+            )
+            counters['count'] += 1
+            counters['total_seconds'] += elapsed
+            counters['max_seconds'] = max(counters['max_seconds'], elapsed)
+            if error:
+                counters['errors'] += 1
+            if retried:
+                counters['retries'] += 1
+    
+    def latency_stats(self):
+        """
+        Return a snapshot of the per-endpoint counters.
+        Each entry has count, errors, retries, total_seconds, max_seconds and avg_seconds.
+        """
+        with self._lock:
+            return {
+                endpoint: dict(counters, avg_seconds=counters['total_seconds'] / counters['count'] if counters['count'] else 0.0)
+                for endpoint, counters in self.latency.items()
+            }
+
+
+def parse_live_events(status_code, events_data):
+    """Extract the events list from a live events response."""
+    if status_code == 200:
+        return events_data.get("events", [])
+    logger.warning("  Response status: %s", status_code)
+    return []
+
+
+def parse_match_stats(status_code, stats_data):
+    """Extract the full-match statistics block from a statistics response."""
+    if status_code == 200:
+        if "statistics" in stats_data and stats_data["statistics"]:
+            return stats_data["statistics"][0]
+    return None
+
+
+def event_details_url(match_id):
+    """Build the event details URL for a match."""
+    return config.SOFASCORE_EVENT_URL_TEMPLATE.format(match_id=match_id)
 
 
 def fetch_live_events(scraper):
     """Fetch all live tennis events from SofaScore API."""
+    start = time.perf_counter()
+    status = "error"
     try:
-        response = scraper.get(config.SOFASCORE_LIVE_EVENTS_URL)
-        if response.status_code == 200:
-            events_data = response.json()
-            return events_data.get("events", [])
-        else:
-            print(f"  Response status: {response.status_code}")
-            return []
+        response = scraper.get(config.SOFASCORE_LIVE_EVENTS_URL, timeout=SOFASCORE_TIMEOUT)
+        status = response.status_code
+        events_data = response.json() if response.status_code == 200 else None
+        return parse_live_events(response.status_code, events_data)
     except Exception as e:
-        print(f"Error fetching live events: {e}")
+        logger.warning("Error fetching live events: %s", e)
         return []
+    finally:
+        metrics.record_request("sofascore", "live_events", status, time.perf_counter() - start)
 
 
 def fetch_match_stats(scraper, match_id):
     """Fetch statistics for a specific match."""
+    start = time.perf_counter()
+    status = "error"
     try:
         stats_url = config.SOFASCORE_STATS_URL_TEMPLATE.format(match_id=match_id)
-        stats_resp = scraper.get(stats_url)
-        if stats_resp.status_code == 200:
-            stats_data = stats_resp.json()
-            if "statistics" in stats_data and stats_data["statistics"]:
-                return stats_data["statistics"][0]
-        return None
+        stats_resp = scraper.get(stats_url, timeout=SOFASCORE_TIMEOUT)
+        status = stats_resp.status_code
+        stats_data = stats_resp.json() if stats_resp.status_code == 200 else None
+        return parse_match_stats(stats_resp.status_code, stats_data)
     except Exception as e:
-        print(f"Error fetching stats for event {match_id}: {e}")
+        logger.warning("Error fetching stats for event %s: %s", match_id, e)
         return None
+    finally:
+        metrics.record_request("sofascore", "statistics", status, time.perf_counter() - start)
 
 
 def fetch_event_details(scraper, match_id):
     """Fetch full event details which might include serve information."""
+    start = time.perf_counter()
+    status = "error"
     try:
-        url = f"https://api.sofascore.com/api/v1/event/{match_id}"
-        response = scraper.get(url)
+        response = scraper.get(event_details_url(match_id), timeout=SOFASCORE_TIMEOUT)
+        status = response.status_code
         if response.status_code == 200:
             return response.json()
         return None
     except Exception as e:
-        print(f"Error fetching event details: {e}")
+        logger.warning("Error fetching event details: %s", e)
+        return None
+    finally:
+        metrics.record_request("sofascore", "event", status, time.perf_counter() - start)
+
+
+async def fetch_live_events_async(session):
+    """
+    Async variant of fetch_live_events using an aiohttp session.
+    Returns None if the request failed or was refused (e.g. a Cloudflare 403), so the
+    caller can retry through the cloudscraper session.
+    """
+    start = time.perf_counter()
+    status = "error"
+    try:
+        await rate_limiter.acquire_async(config.SOFASCORE_LIVE_EVENTS_URL)
+        async with session.get(config.SOFASCORE_LIVE_EVENTS_URL) as response:
+            rate_limiter.observe(config.SOFASCORE_LIVE_EVENTS_URL, response.status, response.headers)
+            status = response.status
+            if response.status != 200:
+                logger.warning("  ⚠ Async live events request returned %s", response.status)
+                return None
+            return parse_live_events(response.status, await response.json(content_type=None))
+    except Exception as e:
+        logger.warning("Error fetching live events: %s", e)
         return None
+    finally:
+        metrics.record_request("sofascore", "live_events", status, time.perf_counter() - start)
+
+
+def extract_event_info(event_details):
+    """
+    Keep only the fields of an event that never change during a match.
+    Returns dict with first_to_serve, team ids and tournament ids.
+    """
+    event = event_details.get("event", {})
+    tournament = event.get("tournament", {})
+    return {
+        'first_to_serve': event.get("firstToServe"),
+        'home_team_id': event.get("homeTeam", {}).get("id"),
+        'away_team_id': event.get("awayTeam", {}).get("id"),
+        'tournament_id': tournament.get("id"),
+        'unique_tournament_id': tournament.get("uniqueTournament", {}).get("id")
+    }
 
 
-def get_first_server_from_api(scraper, match_id, set_number=1):
+def get_event_info(scraper, match_id, event_info_cache=None):
+    """
+    Get the immutable event fields for a match, downloading event details at most once.
+    
+    Args:
+        scraper: CloudScraper session
+        match_id: Match ID
+        event_info_cache: Optional dict of match_id -> event info to read from and fill.
+            Entries are only stored once firstToServe is known, since SofaScore
+            leaves it empty until the first point is played.
+    
+    Returns:
+        Event info dict (see extract_event_info), or None if not available
+    """
+    if event_info_cache is not None and match_id in event_info_cache:
+        return event_info_cache[match_id]
+    
+    event_details = fetch_event_details(scraper, match_id)
+    if not event_details:
+        return None
+    
+    event_info = extract_event_info(event_details)
+    if event_info_cache is not None and event_info['first_to_serve'] is not None:
+        event_info_cache[match_id] = event_info
+    return event_info
+
+
+def get_first_server_from_api(scraper, match_id, set_number=1, event_info_cache=None):
     """
     Get who served first in a set from SofaScore API.
     
@@ -53,17 +285,17 @@ def get_first_server_from_api(scraper, match_id, set_number=1):
         scraper: CloudScraper session
         match_id: Match ID
         set_number: Set number (1, 2, 3, etc.)
+        event_info_cache: Optional per-match cache of immutable event fields (see get_event_info)
     
     Returns:
         'p1' if home team served first, 'p2' if away team served first, None if not found
     """
     try:
-        event_details = fetch_event_details(scraper, match_id)
-        if not event_details:
+        event_info = get_event_info(scraper, match_id, event_info_cache)
+        if not event_info:
             return None
         
-        event = event_details.get("event", {})
-        first_to_serve = event.get("firstToServe")
+        first_to_serve = event_info['first_to_serve']
         
         if first_to_serve is None:
             return None
@@ -83,8 +315,8 @@ def get_first_server_from_api(scraper, match_id, set_number=1):
         else:
             # Set 3+: alternate (same as set 1)
             return "p1" if first_to_serve == 1 else "p2"
-            
+    
     except Exception as e:
-        print(f"Error getting first server from API: {e}")
+        logger.warning("Error getting first server from API: %s", e)
         return None
 
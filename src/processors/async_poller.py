@@ -0,0 +1,139 @@
+import asyncio
+import config
+from src.api.async_client import create_async_session, prefetch_get, request_key, PrefetchedScraper
+from src.api.sofascore import fetch_live_events, fetch_live_events_async, event_details_url
+from src.processors.change_detector import event_needs_processing
+from src.processors.match_processor import (extract_match_info, extract_score_info, process_matches, log_poll_summary,
+                                           select_slate_refresh)
+from src.processors.poll_scheduler import plan_next_poll
+from src.processors.tournament_detector import detect_tournament_type, is_allowed_tournament
+from src.utils.helpers import current_timestamp
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def build_odds_requests(match_info, cache_manager):
+    """List the Polymarket GET request fetching a match's odds: by market ID once resolved, none while unlisted."""
+    resolution = cache_manager.market_resolver.get(match_info['match_id'])
+    if resolution:
+        return [(config.POLYMARKET_MARKET_URL_TEMPLATE.format(market_id=resolution["market_id"]), None)]
+    if not cache_manager.market_resolver.is_unlisted(match_info['match_id']):
+        return [(config.POLYMARKET_SEARCH_URL, {"q": f"{match_info['player1']} {match_info['player2']}"})]
+    return []
+
+
+def build_prefetch_requests(event, cache_manager):
+    """
+    List the (url, params) GET requests process_match will make for an event.
+    
+    Odds are needed while starting odds are not captured and their retry is due,
+    and for 1-1 matches, unless the odds cache still holds a fresh quote (see
+    build_odds_requests). Stats only once a match can trigger an alert (1-1 sets
+    or 2nd set), and event details only in the 2nd set until the first server is known.
+    """
+    tour_type, _ = detect_tournament_type(event)
+    if not is_allowed_tournament(tour_type):
+        return []
+    
+    match_info = extract_match_info(event)
+    score_info = extract_score_info(event)
+    match_id = match_info['match_id']
+    status_desc = score_info['status_desc'].lower()
+    is_one_one = score_info['sets_home'] == 1 and score_info['sets_away'] == 1
+    is_second_set = "2nd set" in status_desc or "second set" in status_desc
+    
+    retry = cache_manager.starting_odds_retry_cache.get(match_id)
+    starting_odds_due = (match_id not in cache_manager.starting_odds_cache
+                         and (retry is None or cache_manager.monotonic() >= retry["next_attempt"]))
+    
+    requests = []
+    if (starting_odds_due or is_one_one) and not cache_manager.odds_cache.is_fresh((match_info['player1'], match_info['player2'])):
+        requests.extend(build_odds_requests(match_info, cache_manager))
+    if is_one_one or is_second_set:
+        requests.append((config.SOFASCORE_STATS_URL_TEMPLATE.format(match_id=match_id), None))
+    if is_second_set and match_id not in cache_manager.event_info_cache:
+        requests.append((event_details_url(match_id), None))
+    return requests
+
+
+async def prefetch_poll_responses(session, events, cache_manager):
+    """
+    Download every response the poll will need, with up to config.ASYNC_MAX_CONNECTIONS in flight:
+    those of the events to process and the stats and odds the slate ranking refreshes.
+    """
+    requests = {}
+    for event in events:
+        if not event_needs_processing(event, cache_manager):
+            continue
+        for url, params in build_prefetch_requests(event, cache_manager):
+            requests[request_key(url, params)] = (url, params)
+    
+    if config.SLATE_RANKING_ENABLED:
+        _, due = select_slate_refresh(events, cache_manager)
+        for match_info in due:
+            stats_url = config.SOFASCORE_STATS_URL_TEMPLATE.format(match_id=match_info['match_id'])
+            odds_requests = []
+            if not cache_manager.odds_cache.is_fresh((match_info['player1'], match_info['player2'])):
+                odds_requests = build_odds_requests(match_info, cache_manager)
+            for url, params in [(stats_url, None)] + odds_requests:
+                requests[request_key(url, params)] = (url, params)
+    
+    results = await asyncio.gather(*(prefetch_get(session, url, params) for url, params in requests.values()))
+    return {key: response for key, response in results if response is not None}
+
+
+async def async_poll_once(session, scraper, cache_manager):
+    """
+    Run one poll: fetch live events and all per-match responses concurrently,
+    then process the matches on the prefetched data. Live events are fetched
+    through the synchronous scraper when the aiohttp request fails or is refused.
+    
+    Returns:
+        (events, matches_checked, matches_qualified, matches_skipped) tuple
+    """
+    events = await fetch_live_events_async(session)
+    if events is None:
+        events = fetch_live_events(scraper)
+    if not events:
+        return events, 0, 0, 0
+    
+    responses = await prefetch_poll_responses(session, events, cache_manager)
+    prefetched_scraper = PrefetchedScraper(responses, scraper)
+    matches_checked, matches_qualified, matches_skipped = process_matches(events, prefetched_scraper, cache_manager)
+    return events, matches_checked, matches_qualified, matches_skipped
+
+
+async def run_async_poll_loop(scraper, cache_manager):
+    """
+    Async entry point for the monitoring loop.
+    
+    Network requests for a poll overlap on a single thread; alerts and anything
+    not prefetched still go through the synchronous scraper.
+    """
+    async with create_async_session() as session:
+        while True:
+            try:
+                logger.debug("[%s] Fetching live events from SofaScore API (async)...", current_timestamp())
+                
+                events, matches_checked, matches_qualified, matches_skipped = await async_poll_once(session, scraper, cache_manager)
+                logger.debug("  Found %s live event(s)", len(events))
+                
+                if len(events) == 0:
+                    logger.info("[%s] No live matches currently. Waiting...", current_timestamp())
+                    await asyncio.sleep(config.POLL_INTERVAL_SECONDS)
+                    continue
+                
+                # Cleanup old cache entries
+                live_match_ids = {event.get("id") for event in events}
+                cache_manager.cleanup_old_matches(live_match_ids)
+                
+                # Poll faster while any match is close to an alert
+                delay, tier_counts = plan_next_poll(events)
+                log_poll_summary(cache_manager, matches_checked, matches_qualified, matches_skipped, delay, tier_counts)
+                
+                await asyncio.sleep(delay)
+            
+            except Exception as e:
+                logger.exception("[%s] Error in async loop: %s", current_timestamp(), e)
+                await asyncio.sleep(config.POLL_INTERVAL_SECONDS)
@@ -0,0 +1,49 @@
+import config
+from src.processors.poll_scheduler import classify_match_tier, tier_refresh_seconds
+
+
+def compute_event_fingerprint(event):
+    """
+    Build a cheap fingerprint of the parts of a live event that drive processing:
+    status code, sets, games per period (including tiebreak scores) and the point score.
+    """
+    home_score = event.get("homeScore", {})
+    away_score = event.get("awayScore", {})
+    return (
+        event.get("status", {}).get("code"),
+        tuple(sorted((key, value) for key, value in home_score.items() if key.startswith("period") or key in ("current", "point"))),
+        tuple(sorted((key, value) for key, value in away_score.items() if key.startswith("period") or key in ("current", "point")))
+    )
+
+
+def event_needs_processing(event, cache_manager, now=None):
+    """
+    Check, without recording anything, whether an event needs the full process_match path.
+    
+    Returns True if the event is new, if its fingerprint changed and its tier's
+    refresh interval has passed since it was last processed, or if
+    EVENT_REFRESH_SECONDS have passed since then.
+    """
+    previous = cache_manager.event_fingerprints.get(event.get("id"))
+    if previous is None:
+        return True
+    now = cache_manager.monotonic() if now is None else now
+    previous_fingerprint, last_processed = previous
+    elapsed = now - last_processed
+    if elapsed >= config.EVENT_REFRESH_SECONDS:
+        return True
+    if previous_fingerprint == compute_event_fingerprint(event):
+        return False
+    return elapsed >= tier_refresh_seconds(classify_match_tier(event))
+
+
+def should_process_event(event, cache_manager, now=None):
+    """
+    Decide whether an event needs the full process_match path this poll,
+    recording its fingerprint when it does (see event_needs_processing).
+    """
+    now = cache_manager.monotonic() if now is None else now
+    if not event_needs_processing(event, cache_manager, now):
+        return False
+    cache_manager.event_fingerprints[event.get("id")] = (compute_event_fingerprint(event), now)
+    return True
@@ -1,15 +1,27 @@
-import datetime
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+import config
+from src.utils import metrics
 from src.utils.constants import GREEN, ORANGE, RESET
 from src.processors.tournament_detector import detect_tournament_type, is_allowed_tournament
-from src.api.polymarket import fetch_polymarket_odds
-from src.utils.helpers import format_odds_decimal
+from src.api.polymarket import fetch_polymarket_odds_cached
+from src.utils.helpers import format_odds_decimal, current_timestamp
 from src.alerts.one_one_alert import send_one_one_alert
 from src.alerts.break_alert import send_break_alert
 from src.alerts.tiebreak_alert import send_tiebreak_alert
+from src.alerts.dispatcher import flush_alert_digest
+from src.analysis.slate_ranking import rank_slate
 from src.detection.tiebreak_detector import is_tiebreak_in_third_set
-from src.processors.stats_extractor import extract_all_stats
-from src.api.sofascore import fetch_match_stats, get_first_server_from_api
-from src.storage.csv_logger import log_match_to_csv
+from src.processors.stats_extractor import get_match_stats
+from src.processors.starting_odds import capture_starting_odds
+from src.processors.change_detector import should_process_event
+from src.api.sofascore import get_first_server_from_api
+from src.storage.csv_logger import log_match_to_csv, flush_match_log
+from src.storage.snapshot_store import build_snapshot, get_snapshot_store, flush_snapshots
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def extract_match_info(event):
@@ -102,19 +114,14 @@ def process_match(event, scraper, cache_manager, matches_checked):
         p1_ranking = match_info['p1_ranking']
         p2_ranking = match_info['p2_ranking']
         
-        # Detect tournament type
+        # Detect tournament type (process_matches already filtered and counted disallowed tours)
         tour_type, tournament_name = detect_tournament_type(event)
         if not is_allowed_tournament(tour_type):
             return False
+        metrics.MATCHES_PROCESSED.inc()
         
-        # Fetch early odds for starting odds tracking
-        p1_prob_early, p2_prob_early = fetch_polymarket_odds(player1, player2, scraper)
-        if p1_prob_early is not None and p2_prob_early is not None:
-            p1_decimal_early, p2_decimal_early = format_odds_decimal(p1_prob_early, p2_prob_early)
-            if p1_decimal_early is not None and p2_decimal_early is not None:
-                odds_str_early = f"{p1_decimal_early:.2f}/{p2_decimal_early:.2f}"
-                if match_id not in cache_manager.starting_odds_cache:
-                    cache_manager.starting_odds_cache[match_id] = odds_str_early
+        # Capture starting odds (only queries Polymarket until a first quote is found)
+        capture_starting_odds(match_id, player1, player2, scraper, cache_manager)
         
         # Extract score info
         score_info = extract_score_info(event)
@@ -130,10 +137,10 @@ def process_match(event, scraper, cache_manager, matches_checked):
         is_one_one = sets_home == 1 and sets_away == 1
         color = ORANGE if is_one_one else RESET
         
-        print(f"{color}\n  Match {matches_checked}: {player1} vs {player2} (ID: {match_id}){RESET}")
+        logger.debug("%s\n  Match %s: %s vs %s (ID: %s)%s", color, matches_checked, player1, player2, match_id, RESET)
         if tour_type != "Unknown":
-            print(f"{color}    Tournament: {tour_type}{RESET}")
-        print(f"{color}    Sets: {sets_home}-{sets_away}, Games: {games_home}-{games_away}, Status: {status_desc}{RESET}")
+            logger.debug("%s    Tournament: %s%s", color, tour_type, RESET)
+        logger.debug("%s    Sets: %s-%s, Games: %s-%s, Status: %s%s", color, sets_home, sets_away, games_home, games_away, status_desc, RESET)
         
         # Send 1-1 sets alert
         if is_one_one:
@@ -172,9 +179,11 @@ def process_match(event, scraper, cache_manager, matches_checked):
                 prev_games = cache_manager.previous_games_cache.get(match_id, {})
                 if "set2_first_server" not in prev_games or prev_games.get("set2_first_server") is None:
                     # Fetch from API if not cached
-                    set2_first_server = get_first_server_from_api(scraper, match_id, set_number=2)
+                    set2_first_server = get_first_server_from_api(
+                        scraper, match_id, set_number=2, event_info_cache=cache_manager.event_info_cache
+                    )
                     if set2_first_server:
-                        print(f"    ✓ Got first server from API: {set2_first_server}")
+                        logger.debug("    ✓ Got first server from API: %s", set2_first_server)
                 
                 send_break_alert(
                     match_id, player1, player2, p1_ranking, p2_ranking, tour_type,
@@ -187,31 +196,29 @@ def process_match(event, scraper, cache_manager, matches_checked):
         
         # Check qualification criteria for CSV logging
         if check_qualification_criteria(sets_home, sets_away, status_desc, games_home, games_away):
-            print(f"    ✓ Qualifies: 1-1 sets, early 3rd set ({games_home}-{games_away} games)")
+            logger.debug("    ✓ Qualifies: 1-1 sets, early 3rd set (%s-%s games)", games_home, games_away)
             
             # Fetch stats
-            stats = fetch_match_stats(scraper, match_id)
-            if not stats:
-                print(f"    ✗ No statistics available")
+            match_stats = get_match_stats(scraper, match_id, cache_manager)
+            if not match_stats:
+                logger.debug("    ✗ No statistics available")
                 return False
             
-            stats_dict = extract_all_stats(stats)
-            
             # Verify required stats are present (extract_all_stats returns 0 for missing stats, so we check if all are 0)
             # This is a basic check - in practice, if stats were extracted, they should have values
             # We'll proceed with logging since extract_all_stats handles missing stats gracefully
             
-            print(f"    Stats summary:")
-            print(f"      P1: 1st serve {stats_dict['p1_first_serve_pct']}%, 2nd serve {stats_dict['p1_second_serve_pts_pct']}%, opp pts {stats_dict['p1_opp_pts_on_serve']}, BP {stats_dict['p1_bp_saved']}/{stats_dict['p1_bp_faced']}")
-            print(f"      P2: 1st serve {stats_dict['p2_first_serve_pct']}%, 2nd serve {stats_dict['p2_second_serve_pts_pct']}%, opp pts {stats_dict['p2_opp_pts_on_serve']}, BP {stats_dict['p2_bp_saved']}/{stats_dict['p2_bp_faced']}")
-            if stats_dict['p1_total_points'] or stats_dict['p2_total_points']:
-                print(f"      Additional: P1 - Points: {stats_dict['p1_total_points']}, Service pts: {stats_dict['p1_service_points_won']}, Receiver pts: {stats_dict['p1_receiver_points_won']}, Games: {stats_dict['p1_games_won']}, Aces: {stats_dict['p1_aces']}, DFs: {stats_dict['p1_double_faults']}")
-                print(f"                  P2 - Points: {stats_dict['p2_total_points']}, Service pts: {stats_dict['p2_service_points_won']}, Receiver pts: {stats_dict['p2_receiver_points_won']}, Games: {stats_dict['p2_games_won']}, Aces: {stats_dict['p2_aces']}, DFs: {stats_dict['p2_double_faults']}")
+            logger.debug("    Stats summary:")
+            logger.debug("      P1: 1st serve %s%%, 2nd serve %s%%, opp pts %s, BP %s/%s", match_stats.p1.first_serve_pct, match_stats.p1.second_serve_pts_pct, match_stats.p1.opp_pts_on_serve, match_stats.p1.bp_saved, match_stats.p1.bp_faced)
+            logger.debug("      P2: 1st serve %s%%, 2nd serve %s%%, opp pts %s, BP %s/%s", match_stats.p2.first_serve_pct, match_stats.p2.second_serve_pts_pct, match_stats.p2.opp_pts_on_serve, match_stats.p2.bp_saved, match_stats.p2.bp_faced)
+            if match_stats.p1.total_points or match_stats.p2.total_points:
+                logger.debug("      Additional: P1 - Points: %s, Service pts: %s, Receiver pts: %s, Games: %s, Aces: %s, DFs: %s", match_stats.p1.total_points, match_stats.p1.service_points_won, match_stats.p1.receiver_points_won, match_stats.p1.games_won, match_stats.p1.aces, match_stats.p1.double_faults)
+                logger.debug("                  P2 - Points: %s, Service pts: %s, Receiver pts: %s, Games: %s, Aces: %s, DFs: %s", match_stats.p2.total_points, match_stats.p2.service_points_won, match_stats.p2.receiver_points_won, match_stats.p2.games_won, match_stats.p2.aces, match_stats.p2.double_faults)
             
-            print(f"{GREEN}    ✓✓✓ CONDITIONS MET - LOGGING MATCH ✓✓✓{RESET}")
+            logger.debug("%s    ✓✓✓ CONDITIONS MET - LOGGING MATCH ✓✓✓%s", GREEN, RESET)
             
             # Fetch current odds
-            p1_prob, p2_prob = fetch_polymarket_odds(player1, player2, scraper)
+            p1_prob, p2_prob = fetch_polymarket_odds_cached(match_id, player1, player2, scraper, cache_manager)
             if p1_prob is not None and p2_prob is not None:
                 p1_decimal, p2_decimal = format_odds_decimal(p1_prob, p2_prob)
                 if p1_decimal is not None and p2_decimal is not None:
@@ -224,7 +231,7 @@ def process_match(event, scraper, cache_manager, matches_checked):
             starting_odds = cache_manager.starting_odds_cache.get(match_id, odds_str if odds_str != "N/A" else "N/A")
             
             # Prepare match data for CSV
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = current_timestamp(cache_manager.clock())
             match_data = {
                 'timestamp': timestamp,
                 'match_id': match_id,
@@ -240,15 +247,192 @@ def process_match(event, scraper, cache_manager, matches_checked):
             }
             
             # Log to CSV
-            log_match_to_csv(match_data, stats_dict, starting_odds, odds_str)
-            print(f"{GREEN}    [{timestamp}] ✓ Logged to CSV: {player1} vs {player2} (Match ID: {match_id}){RESET}")
+            log_match_to_csv(match_data, match_stats, starting_odds, odds_str)
+            logger.debug("%s    [%s] ✓ Logged to CSV: %s vs %s (Match ID: %s)%s", GREEN, timestamp, player1, player2, match_id, RESET)
             return True
         
         return False
-        
+    
     except Exception as err:
-        print(f"    ✗ Error processing event {event.get('id')}: {err}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("    ✗ Error processing event %s: %s", event.get('id'), err)
         return False
 
+
+def log_poll_summary(cache_manager, matches_checked, matches_qualified, matches_skipped, delay, tier_counts):
+    """
+    Log the end-of-poll summary.
+    At DEBUG this is the multi-line console view; otherwise a single INFO line.
+    """
+    stats_hits, stats_misses = cache_manager.stats_cache.summary()
+    odds_hits, odds_stale_hits, odds_misses = cache_manager.odds_cache.summary()
+    timestamp = current_timestamp(cache_manager.clock())
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n  Summary: Checked %s matches, %s qualified for stats check, %s skipped (unchanged or not due)",
+                     matches_checked, matches_qualified, matches_skipped)
+        logger.debug("  Stats cache: %s fetched, %s reused", stats_misses, stats_hits)
+        logger.debug("  Odds cache (since start): %s fetched, %s reused, %s served stale", odds_misses, odds_hits, odds_stale_hits)
+        logger.debug("  Tiers: %s hot, %s warm, %s cold", tier_counts['hot'], tier_counts['warm'], tier_counts['cold'])
+        logger.debug("  [%s] Waiting %s seconds before next poll...", timestamp, delay)
+        logger.debug("=" * 60)
+        return
+    
+    logger.info(
+        "[%s] Poll: %s checked, %s qualified, %s skipped | stats %s fetched/%s reused | "
+        "odds %s fetched/%s reused/%s stale | tiers %s hot/%s warm/%s cold | next poll in %ss",
+        timestamp, matches_checked, matches_qualified, matches_skipped, stats_misses, stats_hits,
+        odds_misses, odds_hits, odds_stale_hits, tier_counts['hot'], tier_counts['warm'], tier_counts['cold'], delay,
+        extra={"event": "poll_summary", "checked": matches_checked, "qualified": matches_qualified, "skipped": matches_skipped}
+    )
+
+
+def record_snapshots(events, cache_manager):
+    """Append a snapshot of each processed event to the snapshot store, from the poll's caches."""
+    store = get_snapshot_store()
+    for event in events:
+        tour_type, _ = detect_tournament_type(event)
+        if not is_allowed_tournament(tour_type):
+            continue
+        match_info = extract_match_info(event)
+        stats = cache_manager.stats_cache.peek(match_info['match_id'])
+        odds = cache_manager.odds_cache.peek((match_info['player1'], match_info['player2']))
+        store.append(build_snapshot(event, stats, odds, cache_manager.clock()))
+
+
+def refresh_slate_match(match_info, scraper, cache_manager):
+    """Load a match's stats and odds through the poll's caches for the slate ranking."""
+    match_id = match_info['match_id']
+    get_match_stats(scraper, match_id, cache_manager)
+    fetch_polymarket_odds_cached(match_id, match_info['player1'], match_info['player2'], scraper, cache_manager,
+                                 allow_stale=True)
+
+
+def select_slate_refresh(events, cache_manager):
+    """
+    Pick the live matches whose stats and odds the slate ranking refreshes this poll:
+    up to SLATE_RANKING_REFRESH_BUDGET allowed matches, never refreshed first, then
+    the longest ago (event order for ties).
+    
+    Returns:
+        (live, due): match info dicts of all allowed live matches and of those to refresh
+    """
+    live = []
+    for event in events:
+        tour_type, _ = detect_tournament_type(event)
+        if event.get("id") is not None and is_allowed_tournament(tour_type):
+            live.append(extract_match_info(event))
+    
+    due = sorted(live, key=lambda m: cache_manager.slate_refreshed_at.get(m['match_id'], float('-inf')))
+    return live, due[:config.SLATE_RANKING_REFRESH_BUDGET]
+
+
+def rank_live_slate(events, scraper, cache_manager):
+    """
+    Rank every live match by stats edge over the Polymarket price (see rank_slate).
+    
+    Returns:
+        Ranking entries, also stored in cache_manager.slate_ranking
+    """
+    live, due = select_slate_refresh(events, cache_manager)
+    if not config.CONCURRENT_PROCESSING or config.MAX_WORKERS <= 1:
+        for match_info in due:
+            refresh_slate_match(match_info, scraper, cache_manager)
+    else:
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            for future in [executor.submit(refresh_slate_match, m, scraper, cache_manager) for m in due]:
+                future.result()
+    # Tried matches count as refreshed even without stats, so they do not take the budget every poll
+    now = cache_manager.monotonic()
+    for match_info in due:
+        cache_manager.slate_refreshed_at[match_info['match_id']] = now
+    for match_info in live:
+        if cache_manager.stats_cache.peek(match_info['match_id']) is not None:
+            cache_manager.slate_refreshed_at[match_info['match_id']] = now
+    
+    entries = []
+    for match_info in live:
+        stats = cache_manager.stats_cache.last_known(match_info['match_id'])
+        odds = cache_manager.odds_cache.peek((match_info['player1'], match_info['player2']))
+        if stats is None or not odds or odds[0] is None or odds[1] is None or odds[0] + odds[1] <= 0:
+            continue
+        entries.append((match_info['match_id'], match_info['player1'], match_info['player2'], stats, odds))
+    
+    ranking = rank_slate(entries)
+    cache_manager.slate_ranking = ranking
+    
+    value_entries = [entry for entry in ranking[:config.SLATE_RANKING_TOP_N]
+                     if abs(entry['divergence']) >= config.SLATE_RANKING_MIN_DIVERGENCE]
+    logger.info("  Slate: %s/%s live matches ranked (%s refreshed), %s diverging from the market by %.0f%%+",
+                len(ranking), len(live), len(due), len(value_entries), config.SLATE_RANKING_MIN_DIVERGENCE * 100,
+                extra={"event": "slate_ranking", "ranked": len(ranking), "live": len(live),
+                       "refreshed": len(due), "value": len(value_entries)})
+    for entry in value_entries:
+        if entry['value_side'] == 'p1':
+            value_player, stats_prob, market_prob = entry['player1'], entry['stats_p1_prob'], entry['market_p1_prob']
+        else:
+            value_player, stats_prob, market_prob = entry['player2'], 1 - entry['stats_p1_prob'], 1 - entry['market_p1_prob']
+        logger.debug("  Value: %s vs %s - stats favour %s %.0f%%, market %.0f%%",
+                     entry['player1'], entry['player2'], value_player, stats_prob * 100, market_prob * 100,
+                     extra={"event": "slate_value", **entry})
+    return ranking
+
+
+def process_matches(events, scraper, cache_manager):
+    """
+    Process all live events for one poll.
+    
+    Returns:
+        (matches_checked, matches_qualified, matches_skipped) tuple
+    """
+    poll_start = time.perf_counter()
+    matches_checked = 0
+    matches_qualified = 0
+    matches_skipped = 0
+    metrics.LIVE_EVENTS.set(len(events))
+    metrics.LIVE_EVENTS_SEEN.inc(len(events))
+    
+    # Stats fetched during the previous poll are stale now
+    cache_manager.start_poll()
+    
+    to_process = []
+    for event in events:
+        matches_checked += 1
+        tour_type, _ = detect_tournament_type(event)
+        if not is_allowed_tournament(tour_type):
+            metrics.MATCHES_FILTERED.inc(tour_type=tour_type)
+            continue
+        if should_process_event(event, cache_manager):
+            to_process.append((matches_checked, event))
+        else:
+            matches_skipped += 1
+    
+    if not config.CONCURRENT_PROCESSING or config.MAX_WORKERS <= 1:
+        for match_number, event in to_process:
+            if process_match(event, scraper, cache_manager, match_number):
+                matches_qualified += 1
+    else:
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(process_match, event, scraper, cache_manager, match_number)
+                for match_number, event in to_process
+            ]
+            for future in futures:
+                if future.result():
+                    matches_qualified += 1
+    
+    # Send the alerts held back for the digest (no-op unless config.ALERT_DIGEST_MODE)
+    flush_alert_digest(scraper, cache_manager)
+    
+    if config.SNAPSHOTS_ENABLED:
+        record_snapshots([event for _, event in to_process], cache_manager)
+    
+    if config.SLATE_RANKING_ENABLED:
+        rank_live_slate(events, scraper, cache_manager)
+    
+    # Poll boundary: write buffered match log rows, snapshots and market resolutions
+    flush_match_log()
+    flush_snapshots()
+    cache_manager.market_resolver.flush()
+    
+    metrics.POLL_DURATION.observe(time.perf_counter() - poll_start)
+    return matches_checked, matches_qualified, matches_skipped
@@ -0,0 +1,141 @@
+from src.utils.helpers import safe_ratio
+
+# Statistic names, each stored for both players
+STAT_NAMES = (
+    'first_serve_pct',
+    'second_serve_pts_pct',
+    'opp_pts_on_serve',
+    'bp_faced',
+    'bp_saved',
+    'aces',
+    'double_faults',
+    'total_points',
+    'service_points_won',
+    'receiver_points_won',
+    'games_won',
+    'first_serve_points',
+    'second_serve_points',
+    'bp_converted',
+)
+
+# Flat field names in storage (and CSV) order: p1_first_serve_pct, p2_first_serve_pct, ...
+STAT_FIELDS = tuple(f"p{side}_{name}" for name in STAT_NAMES for side in (1, 2))
+FIELD_INDEX = {field: index for index, field in enumerate(STAT_FIELDS)}
+
+
+class MatchStats:
+    """
+    Extracted statistics of a match, stored as one flat list in STAT_FIELDS order.
+    
+    Read a player's statistics through the p1/p2 views (stats.p1.aces,
+    stats.p2.service_pts_won_pct). stats['p1_aces'] still works for code written
+    against the old dictionary.
+    """
+    __slots__ = ('values', '_p1', '_p2')
+    
+    def __init__(self, values):
+        self.values = values
+        self._p1 = None
+        self._p2 = None
+    
+    @classmethod
+    def from_dict(cls, stats_dict):
+        """Build from a p1_*/p2_* dictionary, e.g. a stored snapshot; missing fields are 0."""
+        return cls([stats_dict.get(field, 0) for field in STAT_FIELDS])
+    
+    @property
+    def p1(self):
+        if self._p1 is None:
+            self._p1 = PlayerStats(self, 0)
+        return self._p1
+    
+    @property
+    def p2(self):
+        if self._p2 is None:
+            self._p2 = PlayerStats(self, 1)
+        return self._p2
+    
+    @property
+    def total_points_played(self):
+        return self.values[FIELD_INDEX['p1_total_points']] + self.values[FIELD_INDEX['p2_total_points']]
+    
+    def __getitem__(self, field):
+        return self.values[FIELD_INDEX[field]]
+    
+    def __eq__(self, other):
+        if isinstance(other, MatchStats):
+            return self.values == other.values
+        return NotImplemented
+    
+    def __repr__(self):
+        return f"MatchStats({self.as_dict()!r})"
+    
+    def as_dict(self):
+        """Return the p1_*/p2_* dictionary, e.g. for JSON."""
+        return dict(zip(STAT_FIELDS, self.values))
+    
+    def csv_values(self):
+        """The 28 statistic columns of a CSV row, in CSV_HEADER order."""
+        return self.values
+
+
+def _stat_property(offset):
+    return property(lambda self: self.stats.values[offset + self.side], doc=STAT_NAMES[offset // 2])
+
+
+class PlayerStats:
+    """
+    One player's view of a MatchStats, with ratios computed on access.
+    
+    Supports .get(name, default) so it can be passed to determine_better_player
+    in place of the per-player dictionaries.
+    """
+    __slots__ = ('stats', 'side')
+    
+    def __init__(self, stats, side):
+        self.stats = stats
+        self.side = side  # 0 = p1 (home), 1 = p2 (away)
+    
+    @property
+    def opponent(self):
+        return self.stats.p2 if self.side == 0 else self.stats.p1
+    
+    @property
+    def second_serve_pct(self):
+        """Second serve points won %, under the name determine_better_player uses."""
+        return self.second_serve_pts_pct
+    
+    @property
+    def bp_saved_pct(self):
+        return safe_ratio(self.bp_saved, self.bp_faced) if self.bp_faced > 0 else 0
+    
+    @property
+    def service_points_total(self):
+        return self.service_points_won + self.opp_pts_on_serve
+    
+    @property
+    def service_pts_won_pct(self):
+        total = self.service_points_total
+        return safe_ratio(self.service_points_won, total) if total > 0 else 0
+    
+    @property
+    def return_points_total(self):
+        return self.receiver_points_won + self.opponent.service_points_won
+    
+    @property
+    def return_pts_won_pct(self):
+        total = self.return_points_total
+        return safe_ratio(self.receiver_points_won, total) if total > 0 else 0
+    
+    @property
+    def total_pts_won_pct(self):
+        total = self.stats.total_points_played
+        return safe_ratio(self.total_points, total) if total > 0 else 0
+    
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+
+# first_serve_pct, aces, ... read straight from the match's list
+for _index, _name in enumerate(STAT_NAMES):
+    setattr(PlayerStats, _name, _stat_property(2 * _index))
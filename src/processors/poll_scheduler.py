@@ -0,0 +1,84 @@
+import config
+from src.processors.tournament_detector import detect_tournament_type, is_allowed_tournament
+
+HOT = "hot"
+WARM = "warm"
+COLD = "cold"
+
+
+def get_current_set_games(event):
+    """Return (set_number, games_home, games_away) for the set in play, or (None, None, None)."""
+    status_desc = event.get("status", {}).get("description", "").lower()
+    home_score = event.get("homeScore", {})
+    away_score = event.get("awayScore", {})
+    
+    if "3rd set" in status_desc or "third set" in status_desc:
+        set_number = 3
+    elif "2nd set" in status_desc or "second set" in status_desc:
+        set_number = 2
+    elif "1st set" in status_desc or "first set" in status_desc:
+        set_number = 1
+    else:
+        return None, None, None
+    
+    games_home = home_score.get(f"period{set_number}") or 0
+    games_away = away_score.get(f"period{set_number}") or 0
+    return set_number, games_home, games_away
+
+
+def classify_match_tier(event):
+    """
+    Place a live match in the hot, warm or cold tier by how close it is to an alert.
+    
+    - hot: 3rd set at 1-1 sets within a game (CSV qualification) or from 5-5 on
+      (tiebreak alert), or 2nd set with the player who lost the first set within
+      a game of leading (break alert)
+    - warm: any other 1-1 or 2nd-set match, or a close 1st set from 4-4 on
+    - cold: everything else (early or one-sided 1st set, not started)
+    """
+    sets_home = event.get("homeScore", {}).get("current")
+    sets_away = event.get("awayScore", {}).get("current")
+    set_number, games_home, games_away = get_current_set_games(event)
+    if set_number is None:
+        return COLD
+    
+    if set_number == 3 and sets_home == 1 and sets_away == 1:
+        if abs(games_home - games_away) <= 1 or min(games_home, games_away) >= 5:
+            return HOT
+        return WARM
+    
+    if set_number == 2:
+        if sets_home == 0 and sets_away == 1 and games_home >= games_away - 1:
+            return HOT
+        if sets_home == 1 and sets_away == 0 and games_away >= games_home - 1:
+            return HOT
+        return WARM
+    
+    if set_number == 1 and min(games_home, games_away) >= 4:
+        return WARM
+    
+    return COLD
+
+
+def tier_refresh_seconds(tier):
+    """Minimum time between two full processings of a changed match in this tier."""
+    return config.TIER_REFRESH_SECONDS.get(tier, 0)
+
+
+def plan_next_poll(events):
+    """
+    Pick the delay before the next poll from the tiers of the live events of allowed
+    tournaments (the ones process_matches processes).
+    
+    Returns:
+        (delay_seconds, tier_counts) where tier_counts maps tier -> number of matches
+    """
+    tier_counts = {HOT: 0, WARM: 0, COLD: 0}
+    for event in events:
+        tour_type, _ = detect_tournament_type(event)
+        if not is_allowed_tournament(tour_type):
+            continue
+        tier_counts[classify_match_tier(event)] += 1
+    
+    delay = config.HOT_POLL_INTERVAL_SECONDS if tier_counts[HOT] else config.POLL_INTERVAL_SECONDS
+    return delay, tier_counts
@@ -0,0 +1,39 @@
+import config
+from src.api.polymarket import fetch_polymarket_odds_cached
+from src.utils.helpers import format_odds_decimal
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def capture_starting_odds(match_id, player1, player2, scraper, cache_manager):
+    """
+    Capture a match's starting odds once.
+    
+    Polymarket is only queried while no starting quote has been captured, and
+    failed attempts are retried with exponential backoff (STARTING_ODDS_RETRY_BASE_SECONDS,
+    doubling up to STARTING_ODDS_RETRY_MAX_SECONDS) instead of on every poll.
+    
+    Returns:
+        The captured odds string, or None if not captured (yet)
+    """
+    if match_id in cache_manager.starting_odds_cache:
+        return cache_manager.starting_odds_cache[match_id]
+    
+    retry = cache_manager.starting_odds_retry_cache.get(match_id)
+    now = cache_manager.monotonic()
+    if retry and now < retry["next_attempt"]:
+        return None
+    
+    p1_prob, p2_prob = fetch_polymarket_odds_cached(match_id, player1, player2, scraper, cache_manager)
+    p1_decimal, p2_decimal = format_odds_decimal(p1_prob, p2_prob)
+    if p1_decimal is not None and p2_decimal is not None:
+        cache_manager.set_starting_odds(match_id, f"{p1_decimal:.2f}/{p2_decimal:.2f}")
+        cache_manager.clear_starting_odds_retry(match_id)
+        return cache_manager.starting_odds_cache.get(match_id)
+    
+    attempts = retry["attempts"] + 1 if retry else 1
+    delay = min(config.STARTING_ODDS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), config.STARTING_ODDS_RETRY_MAX_SECONDS)
+    cache_manager.schedule_starting_odds_retry(match_id, attempts, now + delay)
+    logger.debug("    ⚠ No starting odds yet (attempt %s), retrying in %ss", attempts, delay)
+    return None
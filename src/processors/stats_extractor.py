@@ -1,138 +1,165 @@
-from src.utils.helpers import to_int
+import re
+from src.api.sofascore import fetch_match_stats
+from src.processors.match_stats import FIELD_INDEX, STAT_FIELDS, MatchStats
+
+# (home, away) "saved/faced (pct%)" strings of break points saved, e.g. '4/6 (67%)'
+SAVED_OF_FACED = re.compile(r"\s*([+-]?\d+)/([+-]?\d+)(?:\s|$)")
+
+
+def parse_count(item, values, p1_index):
+    """Plain counter, e.g. aces."""
+    values[p1_index] = int(item.get("homeValue") or item.get("home") or 0)
+    values[p1_index + 1] = int(item.get("awayValue") or item.get("away") or 0)
+    return True
+
+
+def parse_percentage(item, values, p1_index):
+    """Success rate of a value/total pair, e.g. first serve in."""
+    home_val = item.get("homeValue", 0)
+    home_tot = item.get("homeTotal", 1)
+    away_val = item.get("awayValue", 0)
+    away_tot = item.get("awayTotal", 1)
+    values[p1_index] = int((home_val / home_tot) * 100) if home_tot > 0 else 0
+    values[p1_index + 1] = int((away_val / away_tot) * 100) if away_tot > 0 else 0
+    return True
+
+
+def parse_points_won(item, values, p1_index):
+    """Won count of a value/total pair, e.g. first serve points."""
+    values[p1_index] = int(item.get("homeValue", 0)) if item.get("homeTotal", 1) else 0
+    values[p1_index + 1] = int(item.get("awayValue", 0)) if item.get("awayTotal", 1) else 0
+    return True
+
+
+def parse_receiver_points(item, values, p1_index):
+    """Receiver points won, also stored as the opponent's points lost on serve."""
+    home = int(item.get("homeValue") or item.get("home") or 0)
+    away = int(item.get("awayValue") or item.get("away") or 0)
+    values[p1_index] = away
+    values[p1_index + 1] = home
+    values[FIELD_INDEX['p1_receiver_points_won']] = home
+    values[FIELD_INDEX['p2_receiver_points_won']] = away
+    return True
+
+
+def _parse_saved_of_faced(value, values, saved_index, faced_index):
+    """Store a 'saved/faced (pct%)' string; returns False (storing nothing) if it does not parse."""
+    match = SAVED_OF_FACED.match(value)
+    if match is None:
+        return False
+    try:
+        values[saved_index] = int(match.group(1))
+        values[faced_index] = int(match.group(2))
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+def parse_break_points_saved(item, values, p1_index):
+    """
+    Break points saved and faced of both players from their 'saved/faced' strings.
+    Returns False if the home side does not parse, so a later item may still fill it.
+    """
+    val_home = item.get("home")
+    val_away = item.get("away")
+    # The away side is only read when the home side is a 'saved/faced' string
+    if not (isinstance(val_home, str) and "/" in val_home):
+        return False
+    stored = _parse_saved_of_faced(val_home, values, FIELD_INDEX['p1_bp_saved'], p1_index)
+    if isinstance(val_away, str):
+        _parse_saved_of_faced(val_away, values, FIELD_INDEX['p2_bp_saved'], p1_index + 1)
+    return stored
+
+
+def _rules(*rules):
+    """((p1 field, parser), ...) -> ((p1 index, parser), ...); p2 is at p1 index + 1."""
+    return tuple((FIELD_INDEX[p1_field], parser) for p1_field, parser in rules)
+
+
+# SofaScore's stable statistic "key" -> rules in priority order. An item is stored by
+# the first rule whose p1 field is still unset, so a second "Second serve points" item
+# fills p1_second_serve_points once the percentage is known. Unlisted keys are ignored.
+KEY_RULES = {
+    'firstServeAccuracy': _rules(('p1_first_serve_pct', parse_percentage)),
+    'secondServePointsAccuracy': _rules(('p1_second_serve_pts_pct', parse_percentage),
+                                        ('p1_second_serve_points', parse_points_won)),
+    'receiverPointsScored': _rules(('p1_opp_pts_on_serve', parse_receiver_points)),
+    'breakPointsSaved': _rules(('p1_bp_faced', parse_break_points_saved)),
+    'aces': _rules(('p1_aces', parse_count)),
+    'doubleFaults': _rules(('p1_double_faults', parse_count)),
+    'pointsTotal': _rules(('p1_total_points', parse_count)),
+    'servicePointsScored': _rules(('p1_service_points_won', parse_count)),
+    'gamesWon': _rules(('p1_games_won', parse_count)),
+    'firstServePointsAccuracy': _rules(('p1_first_serve_points', parse_points_won)),
+    'breakPointsScored': _rules(('p1_bp_converted', parse_count)),
+}
+
+# Fallback for items without a key (older payloads): lower-cased name -> (word the
+# lower-cased group name must contain, or None, rules)
+NAME_RULES = {
+    'first serve': (None, KEY_RULES['firstServeAccuracy']),
+    'second serve points': (None, KEY_RULES['secondServePointsAccuracy']),
+    'receiver points won': (None, KEY_RULES['receiverPointsScored']),
+    'break points saved': (None, KEY_RULES['breakPointsSaved']),
+    'aces': (None, KEY_RULES['aces']),
+    'double faults': (None, KEY_RULES['doubleFaults']),
+    'total': ('points', KEY_RULES['pointsTotal']),
+    'service points won': (None, KEY_RULES['servicePointsScored']),
+    'total won': ('games', KEY_RULES['gamesWon']),
+    'first serve points': (None, KEY_RULES['firstServePointsAccuracy']),
+    'break points converted': (None, KEY_RULES['breakPointsScored']),
+}
+
+
+def resolve_name_rules(name, group_name):
+    """Rules of an item without a key, from its name and group name (empty if none)."""
+    entry = NAME_RULES.get(name.strip().lower())
+    if entry is None:
+        return ()
+    group_word, rules = entry
+    if group_word is not None and group_word not in group_name.lower():
+        return ()
+    return rules
 
 
 def extract_all_stats(stats):
     """
     Extract all statistics from SofaScore stats response.
-    Returns a dictionary with all player statistics.
+    Returns a MatchStats with all player statistics; missing statistics are 0.
     """
-    # Initialize variables
-    p1_first_serve_pct = p2_first_serve_pct = None
-    p1_second_serve_pts_pct = p2_second_serve_pts_pct = None
-    p1_opp_pts_on_serve = p2_opp_pts_on_serve = None
-    p1_bp_faced = p2_bp_faced = None
-    p1_bp_saved = p2_bp_saved = None
-    p1_aces = p2_aces = None
-    p1_double_faults = p2_double_faults = None
-    p1_total_points = p2_total_points = None
-    p1_service_points_won = p2_service_points_won = None
-    p1_receiver_points_won = p2_receiver_points_won = None
-    p1_games_won = p2_games_won = None
-    p1_first_serve_points = p2_first_serve_points = None
-    p1_second_serve_points = p2_second_serve_points = None
-    p1_bp_converted = p2_bp_converted = None
-    
-    # Extract stats
+    values = [0] * len(STAT_FIELDS)
+    filled = set()
     for group in stats.get("groups", []):
+        group_name = group.get("groupName", "")
         for item in group.get("statisticsItems", []):
-            name = item.get("name") or item.get("title")
-            if not name:
-                continue
-            stat_name = name.lower()
+            key = item.get("key")
+            if key is not None:
+                rules = KEY_RULES.get(key, ())
+            else:
+                name = item.get("name") or item.get("title")
+                if not name:
+                    continue
+                rules = resolve_name_rules(name, group_name)
             
-            if "first serve" in stat_name and "points" not in stat_name and p1_first_serve_pct is None:
-                home_val = item.get("homeValue", 0)
-                home_tot = item.get("homeTotal", 1)
-                away_val = item.get("awayValue", 0)
-                away_tot = item.get("awayTotal", 1)
-                p1_first_serve_pct = int((home_val / home_tot) * 100) if home_tot > 0 else 0
-                p2_first_serve_pct = int((away_val / away_tot) * 100) if away_tot > 0 else 0
-            elif "second serve points" in stat_name and p1_second_serve_pts_pct is None:
-                home_val = item.get("homeValue", 0)
-                home_tot = item.get("homeTotal", 1)
-                away_val = item.get("awayValue", 0)
-                away_tot = item.get("awayTotal", 1)
-                p1_second_serve_pts_pct = int((home_val / home_tot) * 100) if home_tot > 0 else 0
-                p2_second_serve_pts_pct = int((away_val / away_tot) * 100) if away_tot > 0 else 0
-            elif "receiver points won" in stat_name and p1_opp_pts_on_serve is None:
-                p1_opp_pts_on_serve = int(item.get("awayValue") or item.get("away") or 0)
-                p2_opp_pts_on_serve = int(item.get("homeValue") or item.get("home") or 0)
-                p1_receiver_points_won = int(item.get("homeValue") or item.get("home") or 0)
-                p2_receiver_points_won = int(item.get("awayValue") or item.get("away") or 0)
-            elif "break points saved" in stat_name and p1_bp_faced is None:
-                val_home = item.get("home")
-                val_away = item.get("away")
-                if isinstance(val_home, str) and "/" in val_home:
-                    parts = val_home.split()
-                    if parts:
-                        nums = parts[0].split('/')
-                        if len(nums) == 2:
-                            try:
-                                p1_bp_saved = int(nums[0])
-                                p1_bp_faced = int(nums[1])
-                            except:
-                                pass
-                    parts2 = val_away.split() if isinstance(val_away, str) else []
-                    if parts2:
-                        nums2 = parts2[0].split('/')
-                        if len(nums2) == 2:
-                            try:
-                                p2_bp_saved = int(nums2[0])
-                                p2_bp_faced = int(nums2[1])
-                            except:
-                                pass
-            elif "aces" in stat_name and p1_aces is None:
-                p1_aces = int(item.get("homeValue") or item.get("home") or 0)
-                p2_aces = int(item.get("awayValue") or item.get("away") or 0)
-            elif "double fault" in stat_name and p1_double_faults is None:
-                p1_double_faults = int(item.get("homeValue") or item.get("home") or 0)
-                p2_double_faults = int(item.get("awayValue") or item.get("away") or 0)
-            elif stat_name == "total" and "points" in group.get("groupName", "").lower() and p1_total_points is None:
-                p1_total_points = int(item.get("homeValue") or item.get("home") or 0)
-                p2_total_points = int(item.get("awayValue") or item.get("away") or 0)
-            elif "service points won" in stat_name and p1_service_points_won is None:
-                p1_service_points_won = int(item.get("homeValue") or item.get("home") or 0)
-                p2_service_points_won = int(item.get("awayValue") or item.get("away") or 0)
-            elif "total won" in stat_name and "games" in group.get("groupName", "").lower() and p1_games_won is None:
-                p1_games_won = int(item.get("homeValue") or item.get("home") or 0)
-                p2_games_won = int(item.get("awayValue") or item.get("away") or 0)
-            elif "first serve points" in stat_name and p1_first_serve_points is None:
-                home_val = item.get("homeValue", 0)
-                home_tot = item.get("homeTotal", 1)
-                away_val = item.get("awayValue", 0)
-                away_tot = item.get("awayTotal", 1)
-                p1_first_serve_points = int(home_val) if home_tot else 0
-                p2_first_serve_points = int(away_val) if away_tot else 0
-            elif "second serve points" in stat_name and p1_second_serve_points is None:
-                home_val = item.get("homeValue", 0)
-                home_tot = item.get("homeTotal", 1)
-                away_val = item.get("awayValue", 0)
-                away_tot = item.get("awayTotal", 1)
-                p1_second_serve_points = int(home_val) if home_tot else 0
-                p2_second_serve_points = int(away_val) if away_tot else 0
-            elif "break points converted" in stat_name and p1_bp_converted is None:
-                p1_bp_converted = int(item.get("homeValue") or item.get("home") or 0)
-                p2_bp_converted = int(item.get("awayValue") or item.get("away") or 0)
+            for p1_index, parser in rules:
+                if p1_index in filled:
+                    continue
+                if parser(item, values, p1_index):
+                    filled.add(p1_index)
+                break
     
-    # Convert all stats to int
-    return {
-        'p1_first_serve_pct': to_int(p1_first_serve_pct) if p1_first_serve_pct is not None else 0,
-        'p2_first_serve_pct': to_int(p2_first_serve_pct) if p2_first_serve_pct is not None else 0,
-        'p1_second_serve_pts_pct': to_int(p1_second_serve_pts_pct) if p1_second_serve_pts_pct is not None else 0,
-        'p2_second_serve_pts_pct': to_int(p2_second_serve_pts_pct) if p2_second_serve_pts_pct is not None else 0,
-        'p1_opp_pts_on_serve': to_int(p1_opp_pts_on_serve) if p1_opp_pts_on_serve is not None else 0,
-        'p2_opp_pts_on_serve': to_int(p2_opp_pts_on_serve) if p2_opp_pts_on_serve is not None else 0,
-        'p1_bp_faced': to_int(p1_bp_faced) if p1_bp_faced is not None else 0,
-        'p2_bp_faced': to_int(p2_bp_faced) if p2_bp_faced is not None else 0,
-        'p1_bp_saved': to_int(p1_bp_saved) if p1_bp_saved is not None else 0,
-        'p2_bp_saved': to_int(p2_bp_saved) if p2_bp_saved is not None else 0,
-        'p1_aces': to_int(p1_aces) if p1_aces is not None else 0,
-        'p2_aces': to_int(p2_aces) if p2_aces is not None else 0,
-        'p1_double_faults': to_int(p1_double_faults) if p1_double_faults is not None else 0,
-        'p2_double_faults': to_int(p2_double_faults) if p2_double_faults is not None else 0,
-        'p1_total_points': to_int(p1_total_points) if p1_total_points is not None else 0,
-        'p2_total_points': to_int(p2_total_points) if p2_total_points is not None else 0,
-        'p1_service_points_won': to_int(p1_service_points_won) if p1_service_points_won is not None else 0,
-        'p2_service_points_won': to_int(p2_service_points_won) if p2_service_points_won is not None else 0,
-        'p1_receiver_points_won': to_int(p1_receiver_points_won) if p1_receiver_points_won is not None else 0,
-        'p2_receiver_points_won': to_int(p2_receiver_points_won) if p2_receiver_points_won is not None else 0,
-        'p1_games_won': to_int(p1_games_won) if p1_games_won is not None else 0,
-        'p2_games_won': to_int(p2_games_won) if p2_games_won is not None else 0,
-        'p1_first_serve_points': to_int(p1_first_serve_points) if p1_first_serve_points is not None else 0,
-        'p2_first_serve_points': to_int(p2_first_serve_points) if p2_first_serve_points is not None else 0,
-        'p1_second_serve_points': to_int(p1_second_serve_points) if p1_second_serve_points is not None else 0,
-        'p2_second_serve_points': to_int(p2_second_serve_points) if p2_second_serve_points is not None else 0,
-        'p1_bp_converted': to_int(p1_bp_converted) if p1_bp_converted is not None else 0,
-        'p2_bp_converted': to_int(p2_bp_converted) if p2_bp_converted is not None else 0,
-    }
+    return MatchStats(values)
+
 
+def get_match_stats(scraper, match_id, cache_manager):
+    """
+    Fetch and extract statistics for a match, at most once per poll.
+    Returns the extracted MatchStats, or None if no statistics are available.
+    """
+    def load():
+        stats = fetch_match_stats(scraper, match_id)
+        if not stats:
+            return None
+        return extract_all_stats(stats)
+    
+    return cache_manager.stats_cache.get(match_id, load)
@@ -1,27 +1,101 @@
+import threading
+import time
+import config
+from src.utils.helpers import current_timestamp
+from src.storage.key_stats_cache import KeyStatsCache
+from src.storage.market_resolver import MarketResolver
+from src.storage.odds_cache import OddsCache
+from src.storage.stats_cache import PollStatsCache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
 class CacheManager:
     """Manages all caches for the application."""
     
-    def __init__(self):
+    def __init__(self, clock=None):
+        """
+        Args:
+            clock: Optional callable replacing both time.time() and time.monotonic(),
+                e.g. ReplayScraper.clock so a replay follows the recorded timeline
+        """
+        # Wall clock (timestamps, expiry) and monotonic clock (TTLs, refresh intervals)
+        self.clock = clock or time.time
+        self.monotonic = clock or time.monotonic
+        # Guards every cache below when matches are processed from worker threads
+        self.lock = threading.RLock()
         self.starting_odds_cache = {}
+        self.starting_odds_retry_cache = {}  # Backoff state while starting odds are not captured yet
         self.telegram_sent_cache = {}
         self.previous_games_cache = {}
         self.previous_breaks_cache = {}  # Track break points converted to detect actual breaks
+        self.event_info_cache = {}  # Immutable event fields (first server, team/tournament ids)
+        self.event_fingerprints = {}  # match_id -> (score fingerprint, last processed time)
+        self.stats_cache = PollStatsCache()  # Extracted stats, valid for the current poll only
+        self.key_stats_cache = KeyStatsCache()  # Last rendered alert 'Key Stats' block per match (see alerts.renderer)
+        self.slate_ranking = []  # Last poll's matches ranked by stats edge over the market (see analysis.slate_ranking)
+        self.slate_refreshed_at = {}  # match_id -> self.monotonic() of the last slate ranking refresh
+        self.odds_cache = OddsCache(
+            config.ODDS_CACHE_TTL_SECONDS,
+            config.ODDS_CACHE_STALE_SECONDS,
+            config.ODDS_CACHE_MAX_ENTRIES,
+            config.ODDS_CACHE_FAILURE_TTL_SECONDS,
+            clock=self.monotonic
+        )
+        self.market_resolver = MarketResolver(
+            config.MARKET_RESOLUTIONS_FILE,
+            config.MARKET_NEGATIVE_CACHE_SECONDS,
+            config.MARKET_RESOLUTION_MAX_AGE_SECONDS,
+            clock=self.clock
+        )
+    
+    def start_poll(self):
+        """Reset poll-scoped caches at the beginning of a poll."""
+        self.stats_cache.start_poll()
     
     def cleanup_old_matches(self, live_match_ids):
         """Remove cache entries for matches that are no longer live."""
+        with self.lock:
+            self._cleanup_old_matches(live_match_ids)
+    
+    def _cleanup_old_matches(self, live_match_ids):
         # Cleanup telegram cache
         old_match_ids = set(self.telegram_sent_cache.keys()) - live_match_ids
         if old_match_ids:
             for old_id in old_match_ids:
                 del self.telegram_sent_cache[old_id]
-            print(f"  Cleaned up {len(old_match_ids)} old match(es) from Telegram cache")
+            logger.debug("  Cleaned up %s old match(es) from Telegram cache", len(old_match_ids))
         
         # Cleanup previous games cache
         old_games_match_ids = set(self.previous_games_cache.keys()) - live_match_ids
         if old_games_match_ids:
             for old_id in old_games_match_ids:
                 del self.previous_games_cache[old_id]
-            print(f"  Cleaned up {len(old_games_match_ids)} old match(es) from games cache")
+            logger.debug("  Cleaned up %s old match(es) from games cache", len(old_games_match_ids))
+        
+        # Cleanup starting odds retry schedule
+        for old_id in set(self.starting_odds_retry_cache.keys()) - live_match_ids:
+            del self.starting_odds_retry_cache[old_id]
+        
+        # Cleanup event info cache
+        for old_id in set(self.event_info_cache.keys()) - live_match_ids:
+            del self.event_info_cache[old_id]
+        
+        # Cleanup event fingerprints
+        for old_id in set(self.event_fingerprints.keys()) - live_match_ids:
+            del self.event_fingerprints[old_id]
+        
+        # Cleanup rendered key stats blocks
+        self.key_stats_cache.prune(live_match_ids)
+        
+        # Cleanup last known stats and slate refresh times
+        self.stats_cache.prune(live_match_ids)
+        for old_id in set(self.slate_refreshed_at.keys()) - live_match_ids:
+            del self.slate_refreshed_at[old_id]
+        
+        # Cleanup market resolutions of finished matches
+        self.market_resolver.prune(live_match_ids)
         
         # Cleanup previous breaks cache
         old_breaks_match_ids = set(self.previous_breaks_cache.keys()) - live_match_ids
@@ -39,6 +113,10 @@ class CacheManager:
             set2_games_away: Games won by away team in set 2
             set2_first_server: Who served first in set 2 ('p1' or 'p2'), from API if available
         """
+        with self.lock:
+            self._update_games_cache(match_id, set2_games_home, set2_games_away, set2_first_server)
+    
+    def _update_games_cache(self, match_id, set2_games_home, set2_games_away, set2_first_server):
         if match_id not in self.previous_games_cache:
             self.previous_games_cache[match_id] = {}
         self.previous_games_cache[match_id]["prev_set2_games_home"] = set2_games_home
@@ -56,4 +134,41 @@ class CacheManager:
             else:
                 # Can't determine, will need to wait for API data or more games
                 self.previous_games_cache[match_id]["set2_first_server"] = None
-
+    
+    def set_starting_odds(self, match_id, odds_str):
+        """Record starting odds for a match unless they were already captured."""
+        with self.lock:
+            if match_id not in self.starting_odds_cache:
+                self.starting_odds_cache[match_id] = odds_str
+    
+    def schedule_starting_odds_retry(self, match_id, attempts, next_attempt):
+        """Record a failed starting odds capture and when to try again (self.monotonic())."""
+        with self.lock:
+            self.starting_odds_retry_cache[match_id] = {"attempts": attempts, "next_attempt": next_attempt}
+    
+    def clear_starting_odds_retry(self, match_id):
+        """Forget the retry schedule once starting odds are captured."""
+        with self.lock:
+            self.starting_odds_retry_cache.pop(match_id, None)
+    
+    def update_breaks_cache(self, match_id, p1_bp_converted, p2_bp_converted):
+        """Remember break points converted so the next poll can detect new breaks."""
+        with self.lock:
+            if match_id not in self.previous_breaks_cache:
+                self.previous_breaks_cache[match_id] = {}
+            self.previous_breaks_cache[match_id]["prev_p1_bp_converted"] = p1_bp_converted
+            self.previous_breaks_cache[match_id]["prev_p2_bp_converted"] = p2_bp_converted
+    
+    def mark_alert_sent(self, match_id, alert_key):
+        """
+        Flag an alert as sent for a match.
+        
+        Args:
+            match_id: Match ID
+            alert_key: Cache flag, e.g. '1-1_alert_sent' or 'break_alert_sent'
+        """
+        with self.lock:
+            if match_id not in self.telegram_sent_cache:
+                self.telegram_sent_cache[match_id] = {}
+            self.telegram_sent_cache[match_id][alert_key] = True
+            self.telegram_sent_cache[match_id]["last_sent_time"] = current_timestamp(self.clock())
@@ -1,70 +1,196 @@
+import atexit
 import csv
 import os
+import threading
+import time
 import config
+from src.storage.sqlite_logger import SqliteSink
+from src.utils import metrics
+
+CSV_HEADER = [
+    "Timestamp", "MatchID", "Player1", "Player2", 
+    "P1 Ranking", "P2 Ranking",
+    "Tournament", "SetsScore", "GamesScore", "CurrentSetGames",
+    "P1 1stServe%", "P2 1stServe%", 
+    "P1 2ndServePts%", "P2 2ndServePts%", 
+    "P1 OppPtsOnServe", "P2 OppPtsOnServe", 
+    "P1 BPFaced", "P2 BPFaced", 
+    "P1 BPSaved", "P2 BPSaved",
+    "P1 Aces", "P2 Aces",
+    "P1 DoubleFaults", "P2 DoubleFaults",
+    "P1 TotalPoints", "P2 TotalPoints",
+    "P1 ServicePointsWon", "P2 ServicePointsWon",
+    "P1 ReceiverPointsWon", "P2 ReceiverPointsWon",
+    "P1 GamesWon", "P2 GamesWon",
+    "P1 FirstServePoints", "P2 FirstServePoints",
+    "P1 SecondServePoints", "P2 SecondServePoints",
+    "P1 BPConverted", "P2 BPConverted",
+    "StartingOdds", "LiveOdds"
+]
+
+
+class CsvSink:
+    """
+    Long-lived, buffered CSV writer.
+    
+    Keeps the output file open and buffers rows in memory. Buffered rows are
+    written when flush_rows rows are waiting, when flush_seconds have passed since
+    the last flush (checked on write), on flush() (called at each poll boundary)
+    and on close(). fsync_policy controls durability:
+    - "never": leave syncing to the OS
+    - "on_flush": fsync after every flush
+    - "on_close": fsync once when the sink is closed
+    """
+    
+    def __init__(self, path, flush_rows=None, flush_seconds=None, fsync_policy=None):
+        self.path = path
+        self.flush_rows = config.CSV_FLUSH_ROWS if flush_rows is None else flush_rows
+        self.flush_seconds = config.CSV_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.fsync_policy = config.CSV_FSYNC_POLICY if fsync_policy is None else fsync_policy
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._file = None
+        self._writer = None
+        self._last_flush = time.monotonic()
+    
+    def open(self):
+        """Open the file for appending, writing the header if it is empty."""
+        with self._lock:
+            if self._file is not None:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if self._file.tell() == 0:
+                self._writer.writerow(CSV_HEADER)
+                self._file.flush()
+    
+    def write_row(self, row):
+        """Buffer a row, flushing if the row count or time threshold is reached."""
+        self.open()
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+    
+    def flush(self):
+        """Write all buffered rows to the file."""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if self._file is None or not self._buffer:
+            return
+        self._writer.writerows(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+        if self.fsync_policy == "on_flush":
+            os.fsync(self._file.fileno())
+    
+    def close(self):
+        """Flush remaining rows and close the file."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_locked()
+            if self.fsync_policy in ("on_flush", "on_close"):
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+_sink = None
+_sqlite_sink = None
+_sink_lock = threading.Lock()
+
+
+def csv_enabled():
+    return config.STORAGE_BACKEND in ("csv", "both")
+
+
+def sqlite_enabled():
+    return config.STORAGE_BACKEND in ("sqlite", "both")
+
+
+def get_csv_sink():
+    """Return the shared CSV sink for config.OUTPUT_CSV, creating it on first use."""
+    global _sink
+    with _sink_lock:
+        if _sink is None or _sink.path != config.OUTPUT_CSV:
+            if _sink is not None:
+                _sink.close()
+            _sink = CsvSink(config.OUTPUT_CSV)
+        return _sink
+
+
+def get_sqlite_sink():
+    """Return the shared SQLite sink for config.OUTPUT_SQLITE, creating it on first use."""
+    global _sqlite_sink
+    with _sink_lock:
+        if _sqlite_sink is None or _sqlite_sink.path != config.OUTPUT_SQLITE:
+            if _sqlite_sink is not None:
+                _sqlite_sink.close()
+            _sqlite_sink = SqliteSink(config.OUTPUT_SQLITE)
+        return _sqlite_sink
+
+
+def flush_match_log():
+    """Write buffered rows to every open backend (called at the end of every poll)."""
+    for sink in (_sink, _sqlite_sink):
+        if sink is not None:
+            sink.flush()
+
+
+def close_match_log():
+    """Flush and close every open backend."""
+    for sink in (_sink, _sqlite_sink):
+        if sink is not None:
+            sink.close()
+
+
+# Make sure buffered rows reach disk on interpreter exit (including SIGTERM via sys.exit)
+atexit.register(close_match_log)
 
 
 def ensure_csv_header():
-    """Write CSV header only if file doesn't exist."""
-    if not os.path.exists(config.OUTPUT_CSV):
-        # Create data directory if it doesn't exist
-        os.makedirs(os.path.dirname(config.OUTPUT_CSV), exist_ok=True)
-        
-        with open(config.OUTPUT_CSV, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "Timestamp", "MatchID", "Player1", "Player2", 
-                "P1 Ranking", "P2 Ranking",
-                "Tournament", "SetsScore", "GamesScore", "CurrentSetGames",
-                "P1 1stServe%", "P2 1stServe%", 
-                "P1 2ndServePts%", "P2 2ndServePts%", 
-                "P1 OppPtsOnServe", "P2 OppPtsOnServe", 
-                "P1 BPFaced", "P2 BPFaced", 
-                "P1 BPSaved", "P2 BPSaved",
-                "P1 Aces", "P2 Aces",
-                "P1 DoubleFaults", "P2 DoubleFaults",
-                "P1 TotalPoints", "P2 TotalPoints",
-                "P1 ServicePointsWon", "P2 ServicePointsWon",
-                "P1 ReceiverPointsWon", "P2 ReceiverPointsWon",
-                "P1 GamesWon", "P2 GamesWon",
-                "P1 FirstServePoints", "P2 FirstServePoints",
-                "P1 SecondServePoints", "P2 SecondServePoints",
-                "P1 BPConverted", "P2 BPConverted",
-                "StartingOdds", "LiveOdds"
-            ])
-
-
-def log_match_to_csv(match_data, stats_dict, starting_odds, odds_str):
-    """Log match data to CSV file."""
-    with open(config.OUTPUT_CSV, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        current_set_games_str = f"{match_data['current_set_games_home']}-{match_data['current_set_games_away']}" if match_data['current_set_games_home'] is not None and match_data['current_set_games_away'] is not None else "N/A"
-        
-        writer.writerow([
-            match_data['timestamp'],
-            match_data['match_id'],
-            match_data['player1'],
-            match_data['player2'],
-            match_data['p1_ranking'] or "N/A",
-            match_data['p2_ranking'] or "N/A",
-            match_data['tour_type'],
-            match_data['sets_score'],
-            match_data['games_score'],
-            current_set_games_str,
-            stats_dict['p1_first_serve_pct'], stats_dict['p2_first_serve_pct'],
-            stats_dict['p1_second_serve_pts_pct'], stats_dict['p2_second_serve_pts_pct'],
-            stats_dict['p1_opp_pts_on_serve'], stats_dict['p2_opp_pts_on_serve'],
-            stats_dict['p1_bp_faced'], stats_dict['p2_bp_faced'],
-            stats_dict['p1_bp_saved'], stats_dict['p2_bp_saved'],
-            stats_dict['p1_aces'], stats_dict['p2_aces'],
-            stats_dict['p1_double_faults'], stats_dict['p2_double_faults'],
-            stats_dict['p1_total_points'], stats_dict['p2_total_points'],
-            stats_dict['p1_service_points_won'], stats_dict['p2_service_points_won'],
-            stats_dict['p1_receiver_points_won'], stats_dict['p2_receiver_points_won'],
-            stats_dict['p1_games_won'], stats_dict['p2_games_won'],
-            stats_dict['p1_first_serve_points'], stats_dict['p2_first_serve_points'],
-            stats_dict['p1_second_serve_points'], stats_dict['p2_second_serve_points'],
-            stats_dict['p1_bp_converted'], stats_dict['p2_bp_converted'],
-            starting_odds,
-            odds_str
-        ])
+    """Open the configured backends, writing the CSV header only if the file is new or empty."""
+    if csv_enabled():
+        get_csv_sink().open()
+    if sqlite_enabled():
+        get_sqlite_sink().open()
+
+
+def build_csv_row(match_data, match_stats, starting_odds, odds_str):
+    """Build the CSV row for a logged match, in CSV_HEADER order."""
+    current_set_games_str = f"{match_data['current_set_games_home']}-{match_data['current_set_games_away']}" if match_data['current_set_games_home'] is not None and match_data['current_set_games_away'] is not None else "N/A"
+    
+    return [
+        match_data['timestamp'],
+        match_data['match_id'],
+        match_data['player1'],
+        match_data['player2'],
+        match_data['p1_ranking'] or "N/A",
+        match_data['p2_ranking'] or "N/A",
+        match_data['tour_type'],
+        match_data['sets_score'],
+        match_data['games_score'],
+        current_set_games_str,
+        *match_stats.csv_values(),
+        starting_odds,
+        odds_str
+    ]
+
 
+def log_match_to_csv(match_data, match_stats, starting_odds, odds_str):
+    """Log match data to the backends selected by config.STORAGE_BACKEND."""
+    row = build_csv_row(match_data, match_stats, starting_odds, odds_str)
+    if csv_enabled():
+        get_csv_sink().write_row(row)
+        metrics.MATCH_LOG_ROWS.inc(backend="csv")
+    if sqlite_enabled():
+        get_sqlite_sink().write_row(row)
+        metrics.MATCH_LOG_ROWS.inc(backend="sqlite")
@@ -0,0 +1,34 @@
+import threading
+
+
+class KeyStatsCache:
+    """
+    Last rendered alert 'Key Stats' block per match (see alerts.renderer.get_key_stats).
+    
+    Alerts are rendered from the poll thread, its worker pool and the Telegram
+    dispatcher while the poll loop prunes finished matches, so every access
+    goes through one lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # match_id -> (stats values, player1, player2, block)
+    
+    def get(self, match_id, values, player1, player2):
+        """Return the block rendered for exactly these stats and players, or None."""
+        with self._lock:
+            cached = self._entries.get(match_id)
+        if cached is not None and cached[0] == values and cached[1:3] == (player1, player2):
+            return cached[3]
+        return None
+    
+    def store(self, match_id, values, player1, player2, block):
+        """Remember the block rendered for a match's stats."""
+        with self._lock:
+            self._entries[match_id] = (values, player1, player2, block)
+    
+    def prune(self, live_match_ids):
+        """Forget the blocks of matches that are no longer live."""
+        with self._lock:
+            for old_id in set(self._entries) - live_match_ids:
+                del self._entries[old_id]
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MarketResolver:
+    """
+    Persistent mapping from SofaScore match IDs to Polymarket markets.
+    
+    A resolved match stores the market ID and which outcome index belongs to
+    each player, so later polls can fetch prices by market ID instead of
+    searching. Matches without a market get a negative entry that expires
+    after negative_ttl_seconds.
+    
+    Changes are written to disk by flush(), once per poll, rather than on every
+    update; entries of matches that are no longer live are dropped by prune().
+    """
+    
+    def __init__(self, path, negative_ttl_seconds, max_age_seconds, clock=time.time):
+        self.path = path
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.resolved = {}  # match_id (str) -> {market_id, p1_index, p2_index, question, resolved_at}
+        self.unlisted = {}  # match_id (str) -> expiry timestamp
+        self._dirty = False  # Changed since the last save
+        self._load()
+    
+    def _load(self):
+        """Load saved resolutions, dropping expired and outdated entries."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning("  ⚠ Could not read market resolutions from %s: %s", self.path, e)
+            return
+        
+        now = self.clock()
+        self.resolved = {
+            match_id: entry for match_id, entry in data.get("resolved", {}).items()
+            if now - entry.get("resolved_at", 0) < self.max_age_seconds
+        }
+        self.unlisted = {
+            match_id: expires_at for match_id, expires_at in data.get("unlisted", {}).items()
+            if expires_at > now
+        }
+    
+    def _save(self):
+        """Write the mapping to disk atomically. Caller must hold the lock."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, mode='w', encoding='utf-8') as file:
+                json.dump({"resolved": self.resolved, "unlisted": self.unlisted}, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("  ⚠ Could not save market resolutions to %s: %s", self.path, e)
+    
+    def get(self, match_id):
+        """Return the stored resolution for a match, or None."""
+        with self._lock:
+            return self.resolved.get(str(match_id))
+    
+    def is_unlisted(self, match_id):
+        """Check if a match has an unexpired negative entry."""
+        with self._lock:
+            expires_at = self.unlisted.get(str(match_id))
+            if expires_at is None:
+                return False
+            if expires_at <= self.clock():
+                del self.unlisted[str(match_id)]
+                return False
+            return True
+    
+    def store(self, match_id, market_id, p1_index, p2_index, question=None):
+        """Remember the market and outcome ordering for a match."""
+        with self._lock:
+            self.unlisted.pop(str(match_id), None)
+            self.resolved[str(match_id)] = {
+                "market_id": market_id,
+                "p1_index": p1_index,
+                "p2_index": p2_index,
+                "question": question,
+                "resolved_at": self.clock()
+            }
+            self._dirty = True
+    
+    def mark_unlisted(self, match_id):
+        """Record that a match has no Polymarket market, for negative_ttl_seconds."""
+        with self._lock:
+            self.unlisted[str(match_id)] = self.clock() + self.negative_ttl_seconds
+            self._dirty = True
+    
+    def forget(self, match_id):
+        """Drop a stored resolution, e.g. when the market was closed or removed."""
+        with self._lock:
+            if self.resolved.pop(str(match_id), None) is not None:
+                self._dirty = True
+    
+    def prune(self, live_match_ids):
+        """Drop the resolutions and negative entries of matches that are no longer live."""
+        live = {str(match_id) for match_id in live_match_ids}
+        with self._lock:
+            for entries in (self.resolved, self.unlisted):
+                for old_id in set(entries) - live:
+                    del entries[old_id]
+                    self._dirty = True
+    
+    def flush(self):
+        """Write the mapping to disk if it changed since the last flush."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from src.utils import metrics
+
+
+class OddsCache:
+    """
+    TTL + LRU cache for Polymarket odds keyed by player pair.
+    
+    - Entries younger than ttl_seconds are served directly.
+    - Entries up to stale_seconds past their TTL can be served to callers that
+      allow it while a background thread refreshes them (stale-while-revalidate).
+    - A failed lookup ((None, None)) is only kept for failure_ttl_seconds and never
+      served stale, so a Polymarket hiccup does not hide the odds for a full TTL.
+    - Concurrent misses for the same key share one in-flight request.
+    - At most max_entries pairs are kept; the least recently used is evicted.
+    """
+    
+    def __init__(self, ttl_seconds, stale_seconds, max_entries, failure_ttl_seconds=0, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, fetched_at)
+        self._in_flight = {}  # key -> threading.Event
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+    
+    def get(self, key, loader, allow_stale=False):
+        """
+        Return cached odds for key, calling loader() when they are missing or expired.
+        
+        Args:
+            key: Cache key, e.g. (player1, player2)
+            loader: Callable returning (p1_prob, p2_prob)
+            allow_stale: Serve an expired entry and refresh it in the background
+                instead of waiting for a new quote
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = self.clock() - fetched_at
+                failed = value == (None, None)
+                if age < (self.failure_ttl_seconds if failed else self.ttl_seconds):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.CACHE_LOOKUPS.inc(cache="odds", result="hit")
+                    return value
+                if allow_stale and not failed and age < self.ttl_seconds + self.stale_seconds:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    metrics.CACHE_LOOKUPS.inc(cache="odds", result="stale")
+                    if key not in self._in_flight:
+                        self._in_flight[key] = threading.Event()
+                        threading.Thread(target=self._load, args=(key, loader), daemon=True).start()
+                    return value
+            
+            event = self._in_flight.get(key)
+            if event is None:
+                event = threading.Event()
+                self._in_flight[key] = event
+                self.misses += 1
+                metrics.CACHE_LOOKUPS.inc(cache="odds", result="miss")
+                leader = True
+            else:
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="odds", result="hit")
+                leader = False
+        
+        if leader:
+            return self._load(key, loader)
+        
+        event.wait()
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else (None, None)
+    
+    def _load(self, key, loader):
+        """Run loader() for an in-flight key and publish the result."""
+        value = (None, None)
+        try:
+            value = loader()
+        finally:
+            with self._lock:
+                self._entries[key] = (value, self.clock())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                event = self._in_flight.pop(key)
+            event.set()
+        return value
+    
+    def is_fresh(self, key):
+        """Check if get() would serve key from the cache without calling its loader."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            value, fetched_at = entry
+            ttl = self.failure_ttl_seconds if value == (None, None) else self.ttl_seconds
+            return self.clock() - fetched_at < ttl
+    
+    def peek(self, key):
+        """Return the cached odds for key regardless of age, or (None, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else (None, None)
+    
+    def summary(self):
+        """Return (hits, stale_hits, misses) since the cache was created."""
+        with self._lock:
+            return self.hits, self.stale_hits, self.misses
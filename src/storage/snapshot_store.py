@@ -0,0 +1,270 @@
+import argparse
+import atexit
+import datetime
+import glob
+import json
+import os
+import struct
+import threading
+import time
+import config
+from src.processors.match_stats import STAT_FIELDS
+
+# Each record is a 4-byte big-endian payload length followed by a JSON payload
+RECORD_HEADER = struct.Struct(">I")
+# Each index entry is (match_id, byte offset of the record in the matching .bin file)
+INDEX_ENTRY = struct.Struct(">qQ")
+# Snapshot keys in record order; see build_snapshot
+SNAPSHOT_FIELDS = ("t", "m", "c", "d", "h", "a", "s", "o")
+# First record of every records file: the field order of the records that follow
+FILE_HEADER = {"fields": SNAPSHOT_FIELDS, "stat_fields": STAT_FIELDS}
+
+
+def snapshot_paths(directory, day):
+    """Return the (records, index) file paths for a day."""
+    base = os.path.join(directory, f"snapshots-{day.isoformat()}")
+    return base + ".bin", base + ".idx"
+
+
+def encode_record(payload):
+    """Serialise a JSON value to a length-prefixed record."""
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(data)) + data
+
+
+def encode_snapshot(snapshot, header=FILE_HEADER):
+    """
+    Serialise a snapshot dict to a record holding only its values, as a JSON array
+    in the header's field order (stats as a list in its stat_fields order).
+    """
+    stats = snapshot["s"]
+    if stats is not None and header["stat_fields"] is not STAT_FIELDS:
+        stats = dict(zip(STAT_FIELDS, stats))
+        stats = [stats.get(field) for field in header["stat_fields"]]
+    return encode_record([stats if field == "s" else snapshot.get(field) for field in header["fields"]])
+
+
+def decode_snapshot(payload, header):
+    """Turn a record payload back into a snapshot dict with a p1_*/p2_* stats dict."""
+    snapshot = dict(zip(header["fields"], payload))
+    if snapshot.get("s") is not None:
+        snapshot["s"] = dict(zip(header["stat_fields"], snapshot["s"]))
+    return snapshot
+
+
+def read_file_header(f):
+    """Return the field order header at the start of an open records file."""
+    return read_record(f, 0)
+
+
+def read_index(index_path):
+    """
+    Read a day's index file.
+    Returns dict of match_id -> list of record offsets, in write order.
+    """
+    offsets = {}
+    with open(index_path, "rb") as f:
+        data = f.read()
+    # Ignore a trailing partial entry left by an interrupted write
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    for match_id, offset in INDEX_ENTRY.iter_unpack(data[:usable]):
+        offsets.setdefault(match_id, []).append(offset)
+    return offsets
+
+
+def read_record(f, offset):
+    """Read the record payload at offset from an open records file, or None if it is incomplete."""
+    f.seek(offset)
+    header = f.read(RECORD_HEADER.size)
+    if len(header) < RECORD_HEADER.size:
+        return None
+    (length,) = RECORD_HEADER.unpack(header)
+    payload = f.read(length)
+    if len(payload) < length:
+        return None
+    return json.loads(payload)
+
+
+class SnapshotStore:
+    """
+    Append-only log of per-poll match snapshots.
+    
+    Records go to one file per day (snapshots-YYYY-MM-DD.bin, by snapshot time) with
+    a companion .idx file of (match_id, offset) entries, so one match's history is
+    read by seeking to its records instead of scanning the whole day. Each records
+    file starts with a header naming the field order once; the records after it
+    hold values only (see encode_snapshot). Writes are buffered
+    and flushed at the end of each poll; the records file is always flushed before
+    its index, so every indexed offset points at a complete record.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._day = None
+        self._records = None
+        self._index = None
+        self._header = None  # Field order of the open records file
+        self._offset = 0
+    
+    def _open_locked(self, day):
+        if self._day == day:
+            return
+        self._close_locked()
+        os.makedirs(self.directory, exist_ok=True)
+        records_path, index_path = snapshot_paths(self.directory, day)
+        self._records = open(records_path, "ab")
+        self._index = open(index_path, "ab")
+        self._offset = self._records.seek(0, os.SEEK_END)
+        self._day = day
+        if self._offset == 0:
+            self._header = FILE_HEADER
+            header = encode_record(FILE_HEADER)
+            self._records.write(header)
+            self._offset = len(header)
+            return
+        # Keep appending in the format of the records already in the file
+        with open(records_path, "rb") as f:
+            header = read_file_header(f)
+        if tuple(header["fields"]) == SNAPSHOT_FIELDS and tuple(header["stat_fields"]) == STAT_FIELDS:
+            self._header = FILE_HEADER
+        else:
+            self._header = header
+    
+    def append(self, snapshot):
+        """
+        Append a snapshot dict to the file of the day of its time 't'.
+        Snapshots without a match id under 'm' cannot be indexed and are skipped.
+        
+        Returns:
+            True if the snapshot was written
+        """
+        if snapshot.get("m") is None:
+            return False
+        day = datetime.date.fromtimestamp(snapshot["t"])
+        with self._lock:
+            self._open_locked(day)
+            record = encode_snapshot(snapshot, self._header)
+            self._records.write(record)
+            self._index.write(INDEX_ENTRY.pack(snapshot["m"], self._offset))
+            self._offset += len(record)
+        return True
+    
+    def flush(self):
+        """Flush buffered records, then their index entries."""
+        with self._lock:
+            if self._records is not None:
+                self._records.flush()
+                self._index.flush()
+    
+    def _close_locked(self):
+        if self._records is not None:
+            self._records.flush()
+            self._index.flush()
+            self._records.close()
+            self._index.close()
+        self._records = self._index = self._day = self._header = None
+    
+    def close(self):
+        with self._lock:
+            self._close_locked()
+    
+    def read_match_history(self, match_id, days=None):
+        """
+        Read every snapshot of a match, oldest first.
+        
+        Args:
+            match_id: SofaScore event ID
+            days: Optional iterable of datetime.date to read; defaults to every day on disk
+        
+        Returns:
+            List of snapshot dicts
+        """
+        self.flush()
+        if days is None:
+            index_paths = sorted(glob.glob(os.path.join(self.directory, "snapshots-*.idx")))
+        else:
+            index_paths = [snapshot_paths(self.directory, day)[1] for day in sorted(days)]
+        
+        history = []
+        for index_path in index_paths:
+            if not os.path.exists(index_path):
+                continue
+            offsets = read_index(index_path).get(match_id)
+            if not offsets:
+                continue
+            with open(index_path[:-len(".idx")] + ".bin", "rb") as f:
+                header = read_file_header(f)
+                for offset in offsets:
+                    record = read_record(f, offset)
+                    if record is not None:
+                        history.append(decode_snapshot(record, header))
+        return history
+
+
+def build_snapshot(event, stats, odds, now=None):
+    """
+    Build the snapshot dict for a processed event from its MatchStats and odds,
+    timestamped now (unix time, default time.time()).
+    
+    Keys (SNAPSHOT_FIELDS): t (unix time), m (match id), c/d (status code/description),
+    h/a (home/away sets, per-period games and point score), s (stat values in
+    STAT_FIELDS order, or None) and o ([p1_prob, p2_prob] or None). Snapshots read
+    back from the store have s as a p1_*/p2_* dict.
+    """
+    def score(side):
+        return {key: value for key, value in side.items() if key.startswith("period") or key in ("current", "point")}
+    
+    status = event.get("status", {})
+    return {
+        "t": round(time.time() if now is None else now, 3),
+        "m": event.get("id"),
+        "c": status.get("code"),
+        "d": status.get("description"),
+        "h": score(event.get("homeScore", {})),
+        "a": score(event.get("awayScore", {})),
+        "s": list(stats.values) if stats is not None else None,
+        "o": list(odds) if odds and odds[0] is not None else None
+    }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Return the shared snapshot store for config.SNAPSHOTS_DIR, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.directory != config.SNAPSHOTS_DIR:
+            if _store is not None:
+                _store.close()
+            _store = SnapshotStore(config.SNAPSHOTS_DIR)
+        return _store
+
+
+def flush_snapshots():
+    if _store is not None:
+        _store.flush()
+
+
+def close_snapshots():
+    if _store is not None:
+        _store.close()
+
+
+atexit.register(close_snapshots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the recorded snapshot history of a match.")
+    parser.add_argument("match_id", type=int, help="SofaScore event ID")
+    parser.add_argument("--dir", default=config.SNAPSHOTS_DIR, help=f"Snapshot directory (default: {config.SNAPSHOTS_DIR})")
+    args = parser.parse_args()
+    
+    for snapshot in SnapshotStore(args.dir).read_match_history(args.match_id):
+        print(json.dumps(snapshot))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+import time
+import config
+
+# One column per CSV column, in CSV_HEADER order
+SQLITE_COLUMNS = [
+    ("timestamp", "TEXT"), ("match_id", "INTEGER"), ("player1", "TEXT"), ("player2", "TEXT"),
+    ("p1_ranking", "INTEGER"), ("p2_ranking", "INTEGER"),
+    ("tour_type", "TEXT"), ("sets_score", "TEXT"), ("games_score", "TEXT"), ("current_set_games", "TEXT"),
+    ("p1_first_serve_pct", "INTEGER"), ("p2_first_serve_pct", "INTEGER"),
+    ("p1_second_serve_pts_pct", "INTEGER"), ("p2_second_serve_pts_pct", "INTEGER"),
+    ("p1_opp_pts_on_serve", "INTEGER"), ("p2_opp_pts_on_serve", "INTEGER"),
+    ("p1_bp_faced", "INTEGER"), ("p2_bp_faced", "INTEGER"),
+    ("p1_bp_saved", "INTEGER"), ("p2_bp_saved", "INTEGER"),
+    ("p1_aces", "INTEGER"), ("p2_aces", "INTEGER"),
+    ("p1_double_faults", "INTEGER"), ("p2_double_faults", "INTEGER"),
+    ("p1_total_points", "INTEGER"), ("p2_total_points", "INTEGER"),
+    ("p1_service_points_won", "INTEGER"), ("p2_service_points_won", "INTEGER"),
+    ("p1_receiver_points_won", "INTEGER"), ("p2_receiver_points_won", "INTEGER"),
+    ("p1_games_won", "INTEGER"), ("p2_games_won", "INTEGER"),
+    ("p1_first_serve_points", "INTEGER"), ("p2_first_serve_points", "INTEGER"),
+    ("p1_second_serve_points", "INTEGER"), ("p2_second_serve_points", "INTEGER"),
+    ("p1_bp_converted", "INTEGER"), ("p2_bp_converted", "INTEGER"),
+    ("starting_odds", "TEXT"), ("live_odds", "TEXT"),
+]
+
+SQLITE_INDEXES = {
+    "idx_matches_match_id": "match_id",
+    "idx_matches_timestamp": "timestamp",
+    "idx_matches_tour_type": "tour_type",
+    "idx_matches_player1": "player1",
+    "idx_matches_player2": "player2",
+}
+
+INSERT_SQL = "INSERT INTO matches ({}) VALUES ({})".format(
+    ", ".join(name for name, _ in SQLITE_COLUMNS),
+    ", ".join("?" for _ in SQLITE_COLUMNS)
+)
+
+
+def to_db_row(row):
+    """Convert a CSV row to SQLite values ("N/A" and empty cells become NULL)."""
+    return tuple(None if value in ("N/A", "") else value for value in row)
+
+
+class SqliteSink:
+    """
+    Batched SQLite writer for logged matches.
+    
+    Uses WAL mode so readers never block the poller. Rows are buffered and
+    inserted in a single transaction once batch_rows rows are waiting, when
+    flush_seconds have passed since the last flush (checked on write), or on
+    flush()/close().
+    """
+    
+    def __init__(self, path, batch_rows=None, flush_seconds=None):
+        self.path = path
+        self.batch_rows = config.SQLITE_BATCH_ROWS if batch_rows is None else batch_rows
+        self.flush_seconds = config.SQLITE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._conn = None
+        self._last_flush = time.monotonic()
+    
+    def open(self):
+        """Open the database, creating the matches table and indexes if needed."""
+        with self._lock:
+            if self._conn is not None:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{name} {sql_type}" for name, sql_type in SQLITE_COLUMNS)
+            with conn:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS matches (id INTEGER PRIMARY KEY, {columns})")
+                for index_name, column in SQLITE_INDEXES.items():
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON matches ({column})")
+            self._conn = conn
+    
+    def write_row(self, row):
+        """Buffer a row, inserting the batch if the row count or time threshold is reached."""
+        self.open()
+        with self._lock:
+            self._buffer.append(to_db_row(row))
+            if len(self._buffer) >= self.batch_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+    
+    def write_rows(self, rows):
+        """Insert many rows in one transaction (used by the importer)."""
+        self.open()
+        with self._lock:
+            self._buffer.extend(to_db_row(row) for row in rows)
+            self._flush_locked()
+    
+    def flush(self):
+        """Insert all buffered rows."""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if self._conn is None or not self._buffer:
+            return
+        with self._conn:
+            self._conn.executemany(INSERT_SQL, self._buffer)
+        self._buffer.clear()
+    
+    def close(self):
+        """Insert remaining rows and close the database."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+
+
+def import_csv_files(csv_paths, sink):
+    """
+    Load existing CSV logs into a SQLite sink.
+    
+    Rows are appended as-is, so importing the same file twice duplicates it.
+    Rows whose column count does not match the schema are skipped.
+    
+    Returns:
+        (imported, skipped) row counts
+    """
+    imported = skipped = 0
+    for csv_path in csv_paths:
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            rows = []
+            for row in reader:
+                if len(row) != len(SQLITE_COLUMNS):
+                    skipped += 1
+                    continue
+                rows.append(row)
+        sink.write_rows(rows)
+        imported += len(rows)
+        print(f"✓ Imported {len(rows)} rows from {csv_path}")
+    return imported, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CSV match logs into the SQLite database.")
+    parser.add_argument("csv_paths", nargs="+", help="CSV files written by csv_logger")
+    parser.add_argument("--db", default=config.OUTPUT_SQLITE, help=f"SQLite database (default: {config.OUTPUT_SQLITE})")
+    args = parser.parse_args()
+    
+    sink = SqliteSink(args.db)
+    try:
+        imported, skipped = import_csv_files(args.csv_paths, sink)
+    finally:
+        sink.close()
+    print(f"✓ Imported {imported} rows into {args.db}" + (f" (⚠ skipped {skipped} malformed rows)" if skipped else ""))
+
+
+if __name__ == "__main__":
+    main()
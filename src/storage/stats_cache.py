@@ -0,0 +1,95 @@
+import threading
+from src.utils import metrics
+
+
+class PollStatsCache:
+    """
+    Poll-scoped cache of extracted match statistics.
+    
+    Every caller asking for the same match during one poll shares a single fetch:
+    the first caller loads the stats, concurrent callers wait for that load to
+    finish instead of issuing their own request. Call start_poll() at the
+    beginning of each poll to drop everything from the previous cycle.
+    
+    The last stats loaded for each match are also kept across polls (see
+    last_known) for readers that can work with slightly old statistics.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._in_flight = {}
+        self._last_known = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def start_poll(self):
+        """Invalidate all cached stats and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def get(self, match_id, loader):
+        """
+        Return cached stats for a match, calling loader() at most once per poll.
+        
+        Args:
+            match_id: Match ID
+            loader: Callable returning the stats (or None if unavailable)
+        """
+        with self._lock:
+            if match_id in self._entries:
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="stats", result="hit")
+                return self._entries[match_id]
+            event = self._in_flight.get(match_id)
+            if event is None:
+                # We are the leader for this match
+                event = threading.Event()
+                self._in_flight[match_id] = event
+                self.misses += 1
+                metrics.CACHE_LOOKUPS.inc(cache="stats", result="miss")
+                leader = True
+            else:
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="stats", result="hit")
+                leader = False
+        
+        if not leader:
+            event.wait()
+            with self._lock:
+                return self._entries.get(match_id)
+        
+        result = None
+        try:
+            result = loader()
+        finally:
+            with self._lock:
+                self._entries[match_id] = result
+                if result is not None:
+                    self._last_known[match_id] = result
+                del self._in_flight[match_id]
+            event.set()
+        return result
+    
+    def peek(self, match_id):
+        """Return stats already loaded this poll without fetching."""
+        with self._lock:
+            return self._entries.get(match_id)
+    
+    def last_known(self, match_id):
+        """Return the most recent stats loaded for a match in any poll, or None."""
+        with self._lock:
+            return self._last_known.get(match_id)
+    
+    def prune(self, live_match_ids):
+        """Forget the last known stats of matches that are no longer live."""
+        with self._lock:
+            for old_id in set(self._last_known) - live_match_ids:
+                del self._last_known[old_id]
+    
+    def summary(self):
+        """Return (hits, misses) for the current poll."""
+        with self._lock:
+            return self.hits, self.misses
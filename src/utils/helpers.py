@@ -1,3 +1,7 @@
+import datetime
+import time
+
+
 def safe_ratio(numerator, denominator):
     """Safe division with error handling."""
     try:
@@ -23,22 +27,6 @@ def format_odds_decimal(p1_prob, p2_prob):
         return None, None
 
 
-def normalize_name(name):
-    """Normalize name by removing special characters and extracting last name."""
-    name = str(name).lower()
-    # Remove special characters (í -> i, š -> s, etc.)
-    replacements = {
-        'í': 'i', 'š': 's', 'č': 'c', 'ř': 'r', 'ž': 'z',
-        'á': 'a', 'é': 'e', 'ó': 'o', 'ú': 'u', 'ý': 'y',
-        'ñ': 'n', 'ü': 'u', 'ö': 'o', 'ä': 'a'
-    }
-    for old, new in replacements.items():
-        name = name.replace(old, new)
-    # Get last name (last word)
-    parts = name.split()
-    return parts[-1] if parts else name
-
-
 def to_int(val):
     """Convert value to int, handling None, strings, and percentages."""
     if val is None:
@@ -50,3 +38,14 @@ def to_int(val):
     else:
         return 0
 
+
+def current_timestamp(now=None):
+    """
+    Local time as 'YYYY-MM-DD HH:MM:SS'.
+    
+    Args:
+        now: Unix time to format, e.g. cache_manager.clock() so replays reproduce
+            the recorded timestamps; defaults to time.time()
+    """
+    now = time.time() if now is None else now
+    return datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
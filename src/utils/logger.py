@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import config
+
+ROOT_LOGGER_NAME = "tennis"
+
+# Matches the ANSI colour codes from constants.py
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+def get_logger(name):
+    """
+    Return the logger for a module, e.g. get_logger(__name__) -> 'tennis.match_processor'.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name.rsplit('.', 1)[-1]}")
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The message exactly as it used to be printed, ANSI colours included."""
+    
+    def format(self, record):
+        return record.getMessage()
+
+
+class CompactFormatter(logging.Formatter):
+    """One plain line per record: time, level, logger and message without colours."""
+    
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+    
+    def format(self, record):
+        record.message = ANSI_ESCAPE.sub("", record.getMessage()).strip()
+        record.asctime = self.formatTime(record, self.datefmt)
+        return self.formatMessage(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any fields passed with extra=."""
+    
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": ANSI_ESCAPE.sub("", record.getMessage()).strip()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+FORMATTERS = {
+    "console": ConsoleFormatter,
+    "compact": CompactFormatter,
+    "json": JsonFormatter,
+}
+
+
+def setup_logging(level=None, fmt=None, stream=None):
+    """
+    Route every 'tennis.*' logger through a queue to a background writer thread.
+    
+    Callers only merge the message arguments and enqueue the record; output
+    formatting and the write to stdout happen on the listener thread. Records
+    below the configured level are dropped before their message is built.
+    
+    Args:
+        level: Level name or number (default config.LOG_LEVEL). INFO shows the
+            per-poll summary and alert events, DEBUG the full per-match view.
+        fmt: "console", "compact" or "json" (default config.LOG_FORMAT)
+        stream: Output stream (default sys.stdout)
+    """
+    global _listener
+    stop_logging()
+    
+    level = level or config.LOG_LEVEL
+    fmt = fmt or config.LOG_FORMAT
+    if fmt not in FORMATTERS:
+        raise ValueError(f"Unknown log format {fmt!r}, expected one of {', '.join(FORMATTERS)}")
+    
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(FORMATTERS[fmt]())
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.propagate = False
+    
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
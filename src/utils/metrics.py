@@ -0,0 +1,197 @@
+import bisect
+import http.server
+import threading
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Latency buckets in seconds for upstream requests
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets for a whole poll
+POLL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Metrics are only recorded once enable() (or start_metrics_server()) has been called,
+# so instrumentation costs a single flag check while disabled.
+_enabled = False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+    
+    kind = "counter"
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}  # label values tuple -> float
+    
+    def inc(self, amount=1, **labels):
+        if not _enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def samples(self):
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    
+    kind = "gauge"
+    
+    def set(self, value, **labels):
+        if not _enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Histogram with fixed upper bounds, exposed as cumulative buckets."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=REQUEST_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}  # label values tuple -> [per-bucket counts (+Inf last), sum]
+    
+    def observe(self, value, **labels):
+        if not _enabled:
+            return
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+    
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text exposition format."""
+    
+    def __init__(self):
+        self._metrics = []
+    
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+POLL_DURATION = REGISTRY.register(Histogram(
+    "tennis_poll_duration_seconds", "Time spent processing one poll.", buckets=POLL_BUCKETS))
+LIVE_EVENTS = REGISTRY.register(Gauge(
+    "tennis_live_events", "Live events returned by the latest poll."))
+LIVE_EVENTS_SEEN = REGISTRY.register(Counter(
+    "tennis_live_events_seen_total", "Live events seen across all polls."))
+MATCHES_PROCESSED = REGISTRY.register(Counter(
+    "tennis_matches_processed_total", "Matches that went through process_match."))
+MATCHES_FILTERED = REGISTRY.register(Counter(
+    "tennis_matches_filtered_total", "Live events skipped by the tournament filter, counted every poll.", ["tour_type"]))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "tennis_upstream_requests_total", "Requests to upstream APIs by response status ('error' if none).",
+    ["upstream", "endpoint", "status"]))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "tennis_upstream_request_duration_seconds", "Upstream request latency.", ["upstream", "endpoint"]))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "tennis_cache_lookups_total", "Cache lookups by result (hit, stale or miss).", ["cache", "result"]))
+ALERTS = REGISTRY.register(Counter(
+    "tennis_alerts_total", "Alerts by type and outcome (held for digest, queued, sent, failed or spilled).", ["type", "outcome"]))
+MATCH_LOG_ROWS = REGISTRY.register(Counter(
+    "tennis_match_log_rows_total", "Rows written to the match log.", ["backend"]))
+
+
+def record_request(upstream, endpoint, status, seconds):
+    """Count one upstream request and its latency. status is the HTTP status or 'error'."""
+    if not _enabled:
+        return
+    UPSTREAM_REQUESTS.inc(upstream=upstream, endpoint=endpoint, status=status)
+    UPSTREAM_LATENCY.observe(seconds, upstream=upstream, endpoint=endpoint)
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host, port):
+    """Enable metrics and serve them at http://host:port/metrics from a daemon thread."""
+    enable()
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    logger.info("✓ Metrics available at http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,64 @@
+import glob
+import json
+import os
+
+import pytest
+
+from src.api.sofascore import parse_match_stats
+from src.processors.match_stats import STAT_FIELDS
+from src.processors.stats_extractor import extract_all_stats
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stats")
+EXPECTED_FILE = os.path.join(FIXTURES_DIR, "expected.json")
+PAYLOADS = sorted(os.path.basename(path)[:-5] for path in glob.glob(os.path.join(FIXTURES_DIR, "*.json"))
+                  if path != EXPECTED_FILE)
+
+
+def load_stats(name):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json"), encoding='utf-8') as f:
+        return parse_match_stats(200, json.load(f))
+
+
+@pytest.mark.parametrize("name", PAYLOADS)
+def test_golden_payload(name):
+    with open(EXPECTED_FILE, encoding='utf-8') as f:
+        expected = json.load(f)[name]
+    
+    result = extract_all_stats(load_stats(name)).as_dict()
+    
+    assert list(result) == list(STAT_FIELDS)
+    assert result == expected
+
+
+def test_key_takes_precedence_over_name():
+    stats = {"groups": [{"groupName": "Service", "statisticsItems": [
+        {"name": "Renamed in a new locale", "key": "aces", "home": "5", "away": "2", "homeValue": 5, "awayValue": 2},
+        {"name": "Aces", "key": "serviceGamesTotal", "homeValue": 9, "awayValue": 9},
+    ]}]}
+    
+    result = extract_all_stats(stats)
+    
+    assert (result['p1_aces'], result['p2_aces']) == (5, 2)
+
+
+def test_total_without_key_needs_points_group():
+    stats = {"groups": [
+        {"groupName": "Games", "statisticsItems": [{"title": "Total", "home": "9", "away": "8"}]},
+        {"groupName": "Points", "statisticsItems": [{"title": "TOTAL", "home": "44", "away": "39"}]},
+    ]}
+    
+    result = extract_all_stats(stats)
+    
+    assert (result['p1_total_points'], result['p2_total_points']) == (44, 39)
+
+
+def test_half_parseable_break_points_are_ignored():
+    stats = {"groups": [{"groupName": "Service", "statisticsItems": [
+        {"name": "Break points saved", "key": "breakPointsSaved", "home": "1/x (0%)", "away": "2/5 (40%)"},
+        {"name": "Break points saved", "key": "breakPointsSaved", "home": "3/4 (75%)", "away": "-"},
+    ]}]}
+    
+    result = extract_all_stats(stats)
+    
+    assert (result['p1_bp_saved'], result['p1_bp_faced']) == (3, 4)
+    assert (result['p2_bp_saved'], result['p2_bp_faced']) == (2, 5)